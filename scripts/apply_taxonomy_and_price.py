@@ -2,52 +2,72 @@
 # -*- coding: utf-8 -*-
 """
 apply_taxonomy_and_price.py — 2025 最終穩定版
-合併 override.json → bgg_data.json
+合併覆蓋值 → bgg_data.json
 補上價格 / 庫存 / 中文類別 / 搜尋關鍵字
+
+覆蓋值（load_overrides，全專案唯一的來源）：
+  data/bgg_ids.json（manual.csv resolve 結果）+ data/override.json（後者優先）
+單筆組裝（merge_game）：BGG 紀錄 + 該 bgg_id 的覆蓋值（依序）+ 中文分類 / 機制 + 搜尋關鍵字
+完整 build、watch_site.py、catalog_db.py rebuild 都走這兩個函式。
+覆蓋值同時寫進 catalog_db 的 manual 表。
+
+  --stream   逐筆讀寫（jsonstream.py）；override 依 bgg_id 先建表，BGG 資料不整份載入
+             （不做 bgg_id 去重，fetch_bgg.py 的輸出本來就不重複）
 """
 
-import json, pathlib
+import argparse, csv, json, pathlib
+
+import catalog_db
+from jsonstream import iter_records, write_records
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 BGG_FILE = ROOT / "data" / "bgg_data.json"
+MANUAL_IDS = ROOT / "data" / "bgg_ids.json"
 OVERRIDE_FILE = ROOT / "data" / "override.json"
+CATEGORY_MAP = ROOT / "data" / "category_map_zh.csv"
+MECHANISM_MAP = ROOT / "data" / "mechanism_map_zh.csv"
+
+OVERRIDE_KEYS = [
+    "name_zh", "price_msrp_twd", "price_twd", "used_price_twd",
+    "manual_override", "stock", "category_zh", "alias_zh",
+    "image_override", "bgg_url_override"
+]
+
+
+def load_map(path: pathlib.Path) -> dict:
+    """讀取 英文 → 中文 對照表（第一欄英文、第二欄中文）"""
+    out = {}
+    if not path.exists():
+        return out
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for row in reader:
+            if len(row) >= 2 and row[0].strip() and row[1].strip():
+                out[row[0].strip()] = row[1].strip()
+    return out
+
+
+def load_taxonomy():
+    return load_map(CATEGORY_MAP), load_map(MECHANISM_MAP)
 
-# ------------------------------------------------------
-# 載入 BGG 資料
-# ------------------------------------------------------
-if BGG_FILE.exists():
-    base_list = json.loads(BGG_FILE.read_text("utf-8"))
-    base = {g["bgg_id"]: g for g in base_list}
-else:
-    base = {}
-
-# ------------------------------------------------------
-# 載入 override（價格 / 庫存 / 中文分類）
-# ------------------------------------------------------
-if OVERRIDE_FILE.exists():
-    overrides = json.loads(OVERRIDE_FILE.read_text("utf-8"))
-else:
-    overrides = []
-
-for row in overrides:
-    gid = row.get("bgg_id")
-    if gid not in base:
-        continue
-
-    g = base[gid]
-
-    for k in [
-        "name_zh", "price_msrp_twd", "price_twd", "used_price_twd",
-        "manual_override", "stock", "category_zh", "alias_zh",
-        "image_override", "bgg_url_override"
-    ]:
+
+def merge_override(g: dict, row: dict) -> dict:
+    """override 有值才覆蓋（None / "" / [] 視為沒填）"""
+    for k in OVERRIDE_KEYS:
         if row.get(k) not in [None, "", []]:
             g[k] = row[k]
+    return g
+
+
+def apply_taxonomy(g: dict, cat_map: dict, mech_map: dict) -> dict:
+    """英文分類 / 機制 → 中文；對照表沒有的保留原文"""
+    g["categories_zh"] = [cat_map.get(c, c) for c in g.get("categories", [])]
+    g["mechanisms_zh"] = [mech_map.get(m, m) for m in g.get("mechanisms", [])]
+    return g
+
 
-# ------------------------------------------------------
-# 建立搜尋關鍵字
-# ------------------------------------------------------
-for g in base.values():
+def build_search_keywords(g: dict) -> dict:
     keys = []
     for k in ["name", "name_zh", "alias_zh"]:
         if g.get(k):
@@ -55,19 +75,99 @@ for g in base.values():
 
     keys.extend(g.get("categories", []))
     keys.extend(g.get("mechanisms", []))
+    keys.extend(g.get("categories_zh", []))
+    keys.extend(g.get("mechanisms_zh", []))
 
     if g.get("category_zh"):
         keys.append(g["category_zh"])
 
     g["search_keywords"] = keys
+    return g
+
+
+def merge_game(raw: dict, rows: list, cat_map: dict, mech_map: dict) -> dict:
+    """單筆組裝：覆蓋值（依序）→ 中文分類 / 機制 → 搜尋關鍵字"""
+    g = dict(raw)
+    for row in rows:
+        merge_override(g, row)
+    apply_taxonomy(g, cat_map, mech_map)
+    return build_search_keywords(g)
+
+
+def _load_list(path: pathlib.Path) -> list:
+    if path.exists():
+        return json.loads(path.read_text("utf-8"))
+    return []
+
+
+def load_overrides(entries: list | None = None) -> list:
+    """manual.csv resolve 結果 + override.json；entries = 已 resolve 好的列（watch_site 用記憶體中的版本）"""
+    if entries is None:
+        entries = _load_list(MANUAL_IDS)
+    return list(entries) + _load_list(OVERRIDE_FILE)
+
+
+def overrides_by_id(overrides: list) -> dict:
+    by_id = {}
+    for row in overrides:
+        if row.get("bgg_id") not in (None, ""):
+            by_id.setdefault(int(row["bgg_id"]), []).append(row)
+    return by_id
+
+
+def sync_catalog(overrides: list):
+    with catalog_db.session() as db:
+        catalog_db.sync_manual(db, overrides)
+
+
+def stream_apply(records, overrides: list):
+    by_id = overrides_by_id(overrides)
+    cat_map, mech_map = load_taxonomy()
+    for g in records:
+        yield merge_game(g, by_id.get(g.get("bgg_id"), []), cat_map, mech_map)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stream", action="store_true", help="逐筆讀寫，不整份載入")
+    args = ap.parse_args()
+
+    overrides = load_overrides()
+    sync_catalog(overrides)
+
+    if args.stream:
+        if BGG_FILE.exists():
+            write_records(BGG_FILE, stream_apply(iter_records(BGG_FILE), overrides), indent=2)
+        print("[OK] apply_taxonomy_and_price.py 完成（stream）")
+        return
+
+    # ------------------------------------------------------
+    # 載入 BGG 資料
+    # ------------------------------------------------------
+    if BGG_FILE.exists():
+        base_list = json.loads(BGG_FILE.read_text("utf-8"))
+        base = {g["bgg_id"]: g for g in base_list}
+    else:
+        base = {}
+
+    # ------------------------------------------------------
+    # 覆蓋值（價格 / 庫存 / 中文名）+ 中文分類 / 機制 + 搜尋關鍵字
+    # ------------------------------------------------------
+    by_id = overrides_by_id(overrides)
+    cat_map, mech_map = load_taxonomy()
+    for gid, g in base.items():
+        base[gid] = merge_game(g, by_id.get(gid, []), cat_map, mech_map)
+
+    # ------------------------------------------------------
+    # 寫回去
+    # ------------------------------------------------------
+    BGG_FILE.write_text(
+        json.dumps(list(base.values()), ensure_ascii=False, indent=2),
+        "utf-8"
+    )
 
-# ------------------------------------------------------
-# 寫回去
-# ------------------------------------------------------
-BGG_FILE.write_text(
-    json.dumps(list(base.values()), ensure_ascii=False, indent=2),
-    "utf-8"
-)
+    print("[OK] apply_taxonomy_and_price.py 完成")
 
-print("[OK] apply_taxonomy_and_price.py 完成")
 
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,9 @@ build_from_csv.py — 從 manual.csv 直接產生網站資料
 - site/data/games.json（前端使用）
 """
 
-import csv, json, pathlib
+import json, pathlib
+
+from manual_csv import load_manual
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 CSV_PATH = ROOT / "data" / "manual.csv"     # ← 這裡改成你要的 manual.csv
@@ -20,22 +22,17 @@ def main():
         return
 
     rows = []
-    with CSV_PATH.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            cleaned = {}
-            for k, v in row.items():
-                v = v.strip() if isinstance(v, str) else v
-                cleaned[k] = v if v != "" else None
-
-            if cleaned.get("image_override"):
-                cleaned["image"] = cleaned["image_override"]
-            elif cleaned.get("bgg_id"):
-                cleaned["image"] = f"https://cf.geekdo-images.com/{cleaned['bgg_id']}.jpg"
-            else:
-                cleaned["image"] = None
-
-            rows.append(cleaned)
+    for row in load_manual(CSV_PATH):
+        cleaned = dict(row)
+
+        if cleaned.get("image_override"):
+            cleaned["image"] = cleaned["image_override"]
+        elif cleaned.get("bgg_id"):
+            cleaned["image"] = f"https://cf.geekdo-images.com/{cleaned['bgg_id']}.jpg"
+        else:
+            cleaned["image"] = None
+
+        rows.append(cleaned)
 
     OUT_FULL.write_text(
         json.dumps(rows, ensure_ascii=False, indent=2),
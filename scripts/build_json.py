@@ -10,22 +10,38 @@ build_json.py — 2025 穩定完整版本
 - 必備欄位：rating_bayes / rating_avg / users_rated / weight / mechanism_count
 - image pipeline：優先 image_override，否則 assets/img/{bgg_id}-{hash}.jpg
 - 相容欄位：minplayers → min_players 等
+- 版本化資料：games.<hash>.json + manifest.json + delta（見 versioned_assets.py）
+- facet 索引：facets.<hash>.json（見 facets.py）
+- 排序名次：ranks.<hash>.json（見 sort_ranks.py）
+- 封面佔位：placeholder（blurhash）/ color（主色），catalog_db 的 images 表（image_placeholders.py 寫入）
+
+資料來源是 catalog_db（見 catalog_db.py）：
+  bgg 表（fetch_bgg 寫入）+ manual 表（apply_taxonomy_and_price 寫入）
+  → catalog_db.rebuild（只寫有變的列）→ 依 games 表輸出
+bgg_data.json 只用來補 db 裡還沒有的 bgg_id（沒跑過 fetch 的 checkout、別台機器抓的分片）。
+
+--stream：逐筆讀寫（jsonstream.py），記憶體用量不隨資料量成長；
+  輸出 games_full.json / games.json，以及 games.<ver>.json + manifest.json
+  （versioned_assets.VersionWriter，邊寫邊算雜湊）。facet / 排序索引與 delta
+  需要整份資料，stream 模式不產生，前端會退回逐筆篩選 / 排序。
 """
 
+import argparse
 import json
 import hashlib
 import pathlib
 
+import catalog_db
+import versioned_assets
+from jsonstream import RecordWriter
+from facets import build_facets
+from sort_ranks import build_ranks
+
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 SRC = ROOT / "data" / "bgg_data.json"
 OUT_FULL = ROOT / "data" / "games_full.json"
 OUT_SITE = ROOT / "site" / "data" / "games.json"
 
-SRC.parent.mkdir(exist_ok=True)
-OUT_SITE.parent.mkdir(parents=True, exist_ok=True)
-
-data = json.loads(SRC.read_text("utf-8")) if SRC.exists() else []
-
 
 def _compat(r: dict) -> dict:
     """欄位補齊＋舊鍵名相容"""
@@ -74,24 +90,76 @@ def _image_for(r: dict) -> str | None:
     return None
 
 
-# === Main process ===
-out_rows = []
-
-for row in data:
+def build_row(row: dict, placeholder_for) -> dict:
+    """單筆：欄位補齊 + 圖片路徑 + 佔位圖 / 主色（placeholder_for：圖片路徑 → {"blurhash", "color"}）"""
     r = _compat(row)
     r["image"] = _image_for(r)
-    out_rows.append(r)
+    ph = placeholder_for(r["image"])
+    r["placeholder"] = ph.get("blurhash")
+    r["color"] = ph.get("color")
+    return r
+
+
+def write_json(out_rows: list) -> None:
+    """只寫 games_full.json + site/data/games.json（watch_site.py 的預覽也用這個）"""
+    # FULL（美化）
+    OUT_FULL.write_text(
+        json.dumps(out_rows, ensure_ascii=False, indent=2),
+        "utf-8"
+    )
+
+    # SITE（壓縮）
+    OUT_SITE.write_text(
+        json.dumps(out_rows, ensure_ascii=False),
+        "utf-8"
+    )
+
+
+def write_outputs(out_rows: list) -> None:
+    write_json(out_rows)
+
+    # SITE（內容雜湊檔名 + manifest + delta；facet / 排序索引跟著同一版本）
+    versioned_assets.publish(out_rows, extras={
+        "facets": build_facets(out_rows),
+        "ranks": build_ranks(out_rows),
+    })
+
+
+def stream_outputs(rows) -> int:
+    with RecordWriter(OUT_FULL, indent=2) as full, RecordWriter(OUT_SITE) as site, \
+            versioned_assets.VersionWriter() as versioned:
+        for r in rows:
+            full.write(r)
+            site.write(r)
+            versioned.write(r)
+    return site.count
+
+
+# === Main process ===
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stream", action="store_true", help="逐筆讀寫，不整份載入")
+    args = ap.parse_args()
+
+    SRC.parent.mkdir(exist_ok=True)
+    OUT_SITE.parent.mkdir(parents=True, exist_ok=True)
+
+    with catalog_db.session() as db:
+        counts = catalog_db.import_files(db, games=False)
+        changed = catalog_db.rebuild(db)
+        print(f"[catalog] 補入 {counts} ; games 變動 {changed} 列")
+
+        if args.stream:
+            n = stream_outputs(catalog_db.iter_games(db))
+            print(f"[OK] build_json.py 完成（stream）；rows={n}")
+            return
+
+        out_rows = list(catalog_db.iter_games(db))
+
+    write_outputs(out_rows)
 
-# FULL（美化）
-OUT_FULL.write_text(
-    json.dumps(out_rows, ensure_ascii=False, indent=2),
-    "utf-8"
-)
+    print(f"[OK] build_json.py 完成；rows={len(out_rows)}")
 
-# SITE（壓縮）
-OUT_SITE.write_text(
-    json.dumps(out_rows, ensure_ascii=False),
-    "utf-8"
-)
 
-print(f"[OK] build_json.py 完成；rows={len(out_rows)}")
+if __name__ == "__main__":
+    main()
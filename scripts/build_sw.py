@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+build_sw.py — 產生 service worker + precache manifest
+
+輸入：
+  - site/data/manifest.json（versioned_assets.py 產出）
+  - site/assets/img/*（download_images.py 產出）
+輸出：
+  - site/precache-manifest.json   資料檔 / 封面圖 + 內容雜湊（不含 games.<ver>.json）
+  - site/sw.js                    內嵌版本號；版本變了瀏覽器才會更新 SW
+
+快取策略：
+  - data/manifest.json 等沒有版本號的資料檔：network-first（離線才用快取）
+  - 頁面 / 版本化衍生索引（data/<name>.<ver>.json）：stale-while-revalidate
+  - games.<ver>.json / delta.*.json：SW 不預抓也不攔截；由頁面的 loadVersioned()
+    決定抓 delta 或整份，存在頁面的 "gg-data" 快取（離線也從那裡讀），只存一份
+  - 封面圖（assets/img/*）：cache-first，用到才存（不預抓，配合 loading="lazy"）；
+    快取 key = URL + "?rev=<內容雜湊>"，啟用時清掉 manifest 中已移除或雜湊改變的圖
+"""
+
+import hashlib, json, pathlib
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SITE = ROOT / "site"
+DATA_MANIFEST = SITE / "data" / "manifest.json"
+IMG_DIR = SITE / "assets" / "img"
+OUT_MANIFEST = SITE / "precache-manifest.json"
+OUT_SW = SITE / "sw.js"
+
+IMG_EXTS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif")
+
+
+def log(msg):
+    print(f"[sw] {msg}")
+
+
+def file_hash(p: pathlib.Path) -> str:
+    return hashlib.sha256(p.read_bytes()).hexdigest()[:10]
+
+
+def data_entries() -> list:
+    out = [{"url": "index.html", "rev": file_hash(SITE / "index.html")}]
+    if not DATA_MANIFEST.exists():
+        games = SITE / "data" / "games.json"
+        if games.exists():
+            out.append({"url": "data/games.json", "rev": file_hash(games)})
+        return out
+
+    m = json.loads(DATA_MANIFEST.read_text("utf-8"))
+    out.append({"url": "data/manifest.json", "rev": file_hash(DATA_MANIFEST)})
+    # 版本化檔名本身就是內容雜湊；games.<ver>.json 交給頁面（delta / 整份）
+    for name in m.get("files", {}).values():
+        out.append({"url": f"data/{name}", "rev": m["version"]})
+    return out
+
+
+def image_entries() -> list:
+    if not IMG_DIR.exists():
+        return []
+    return [
+        {"url": f"assets/img/{p.name}", "rev": file_hash(p)}
+        for p in sorted(IMG_DIR.iterdir())
+        if p.suffix.lower() in IMG_EXTS
+    ]
+
+
+SW_TEMPLATE = r"""/* 由 scripts/build_sw.py 產生，請勿手動修改 */
+const VERSION = "__VERSION__";
+const DATA_CACHE = "gg-sw-data";
+const IMG_CACHE = "gg-sw-img";
+const MANIFEST_URL = "precache-manifest.json";
+
+async function loadManifest(){
+  const r = await fetch(MANIFEST_URL, { cache:"no-cache" });
+  return r.json();
+}
+
+self.addEventListener("install", e=>{
+  e.waitUntil((async()=>{
+    const m = await loadManifest();
+    const c = await caches.open(DATA_CACHE);
+    await c.addAll(["./", ...m.data.map(x=>x.url)]);
+    await c.put(MANIFEST_URL, new Response(JSON.stringify(m)));
+    self.skipWaiting();
+  })());
+});
+
+/* 封面圖：URL → rev（precache-manifest.json），快取 key = URL + "?rev=" + rev */
+let REVS = null;
+
+async function imageRevs(){
+  if(!REVS){
+    const hit = await (await caches.open(DATA_CACHE)).match(MANIFEST_URL);
+    const m = hit ? await hit.json() : { images:[] };
+    REVS = new Map(m.images.map(x=>[new URL(x.url, self.registration.scope).href, x.rev]));
+  }
+  return REVS;
+}
+
+function imageKey(href, revs){
+  const rev = revs.get(href);
+  return rev ? href + "?rev=" + rev : href;
+}
+
+/* 啟用：只清掉過期的圖（已移除或 rev 不同），不預抓 */
+async function pruneImages(){
+  REVS = null;
+  const revs = await imageRevs();
+  const c = await caches.open(IMG_CACHE);
+  for(const req of await c.keys()){
+    const href = req.url.split("?")[0];
+    if(req.url !== imageKey(href, revs) || !revs.has(href)) await c.delete(req);
+  }
+}
+
+self.addEventListener("activate", e=>{
+  e.waitUntil((async()=>{
+    await self.clients.claim();
+    const c = await caches.open(DATA_CACHE);
+    const hit = await c.match(MANIFEST_URL);
+    if(hit){
+      const m = await hit.json();
+      const keep = new Set(["./", ...m.data.map(x=>x.url), MANIFEST_URL]
+        .map(u=>new URL(u, self.registration.scope).href));
+      for(const req of await c.keys()){
+        if(!keep.has(req.url)) await c.delete(req);
+      }
+      await pruneImages();
+    }
+  })());
+});
+
+async function staleWhileRevalidate(e){
+  const c = await caches.open(DATA_CACHE);
+  const hit = await c.match(e.request, { ignoreSearch:true });
+  const net = fetch(e.request).then(r=>{
+    if(r.ok) c.put(e.request, r.clone());
+    return r;
+  }).catch(()=>hit);
+  if(hit){
+    e.waitUntil(net);
+    return hit;
+  }
+  return net;
+}
+
+/* manifest 等沒有版本號的檔：一定先問網路，離線才用快取 */
+async function networkFirst(e){
+  const c = await caches.open(DATA_CACHE);
+  try{
+    const r = await fetch(e.request);
+    if(r.ok) c.put(e.request, r.clone());
+    return r;
+  }catch(err){
+    const hit = await c.match(e.request, { ignoreSearch:true });
+    if(hit) return hit;
+    throw err;
+  }
+}
+
+async function cacheFirst(e){
+  const c = await caches.open(IMG_CACHE);
+  const key = imageKey(e.request.url.split("?")[0], await imageRevs());
+  const hit = await c.match(key);
+  if(hit) return hit;
+  const r = await fetch(e.request);
+  if(r.ok) c.put(key, r.clone());
+  return r;
+}
+
+self.addEventListener("fetch", e=>{
+  const url = new URL(e.request.url);
+  if(e.request.method !== "GET" || url.origin !== location.origin) return;
+
+  const path = url.pathname.slice(new URL(self.registration.scope).pathname.length);
+  /* 遊戲資料 / delta：頁面自己快取（gg-data），這裡不重複存 */
+  if(/^data\/(games|delta)\.[^\/]+\.json$/.test(path)) return;
+  if(path.startsWith("assets/img/")){
+    e.respondWith(cacheFirst(e));
+  }else if(/^data\/[^.\/]+\.json$/.test(path)){
+    e.respondWith(networkFirst(e));
+  }else if(path === "" || path === "index.html" || path.startsWith("data/")){
+    e.respondWith(staleWhileRevalidate(e));
+  }
+});
+"""
+
+
+def main():
+    data = data_entries()
+    images = image_entries()
+
+    body = json.dumps({"data": data, "images": images}, ensure_ascii=False, sort_keys=True)
+    version = hashlib.sha256(body.encode("utf-8")).hexdigest()[:12]
+
+    OUT_MANIFEST.write_text(
+        json.dumps({"version": version, "data": data, "images": images},
+                   ensure_ascii=False, indent=2),
+        "utf-8"
+    )
+    OUT_SW.write_text(SW_TEMPLATE.replace("__VERSION__", version), "utf-8")
+
+    log(f"version {version} ; data={len(data)} ; images={len(images)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+catalog_db.py — 目錄資料庫（SQLite，data/catalog.sqlite3）
+
+pipeline 的唯一來源：各 stage 把結果 upsert 進這裡（每個 stage 一個 transaction），
+build_json.py 用 rebuild 組出 games 表、再從 games 表輸出網站 JSON。
+查單筆 / 局部重建走索引，不必掃整份 list 或重建 {bgg_id: row}。
+
+資料表：
+  manual      覆蓋值（apply_taxonomy_and_price.load_overrides：manual.csv resolve 結果 + override.json；
+              seq = 列序；索引 bgg_id）
+  bgg         BGG API 原始紀錄（bgg_id；fetch_bgg 寫入，尚未套覆蓋值）
+  fetch_meta  每個 bgg_id 的抓取狀態 / 次數 / 時間 / 錯誤（索引 status）
+  images      封面檔名 → bgg_id / 來源 URL / sha1 / blurhash / 主色（索引 bgg_id、sha1）
+  games       網站紀錄 = rebuild 的輸出（pos = 輸出順序；索引 bgg_id）
+
+每一列存 JSON + sha1，內容沒變就不寫；改幾筆就只動幾列。
+
+games 只由 rebuild 寫入：bgg + manual → apply_taxonomy_and_price.merge_game → build_json.build_row
+（佔位圖 / 主色查 images 表）；收錄的 ID = bgg_ids.txt ∪ manual 中的 bgg_id（都要有 bgg 紀錄），
+順序依 bgg_ids.txt、manual 才有的接在後面。
+
+用法：
+  python3 scripts/catalog_db.py import                # 從現有 JSON 檔建立 / 補齊
+  python3 scripts/catalog_db.py rebuild [bgg_id ...]  # bgg + manual → games（不給 id = 全部，順序也重排）
+  python3 scripts/catalog_db.py export                # games → games_full.json / games.json（+ 版本化檔案）
+  python3 scripts/catalog_db.py show <bgg_id>
+  python3 scripts/catalog_db.py stats
+"""
+
+import argparse, contextlib, hashlib, json, pathlib, sqlite3
+from datetime import datetime, timezone
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+DB = ROOT / "data" / "catalog.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS manual (
+    seq         INTEGER PRIMARY KEY,
+    bgg_id      INTEGER,
+    bgg_query   TEXT,
+    data        TEXT NOT NULL,
+    hash        TEXT NOT NULL,
+    updated_at  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS manual_bgg_id ON manual (bgg_id);
+
+CREATE TABLE IF NOT EXISTS bgg (
+    bgg_id      INTEGER PRIMARY KEY,
+    data        TEXT NOT NULL,
+    hash        TEXT NOT NULL,
+    updated_at  TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS fetch_meta (
+    bgg_id      INTEGER PRIMARY KEY,
+    status      TEXT NOT NULL,              -- ok / error
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    fetched_at  TEXT NOT NULL,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS fetch_meta_status ON fetch_meta (status);
+
+CREATE TABLE IF NOT EXISTS images (
+    filename    TEXT PRIMARY KEY,
+    bgg_id      INTEGER,
+    source_url  TEXT,
+    sha1        TEXT,
+    blurhash    TEXT,
+    color       TEXT,
+    updated_at  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_bgg_id ON images (bgg_id);
+CREATE INDEX IF NOT EXISTS images_sha1 ON images (sha1);
+
+CREATE TABLE IF NOT EXISTS games (
+    pos         INTEGER PRIMARY KEY,
+    bgg_id      INTEGER,
+    data        TEXT NOT NULL,
+    hash        TEXT NOT NULL,
+    updated_at  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_bgg_id ON games (bgg_id);
+"""
+
+
+def log(msg):
+    print(f"[catalog] {msg}")
+
+
+def now_ts() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _dump(rec: dict):
+    text = json.dumps(rec, ensure_ascii=False)
+    return text, hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _int_or_none(v):
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+# ------------------------------------------------------
+# 連線
+# ------------------------------------------------------
+def connect(path: pathlib.Path = DB) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")   # 分片並行抓取時可同時寫
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+@contextlib.contextmanager
+def session(path: pathlib.Path = DB):
+    """一個 transaction：正常結束 commit，例外 rollback"""
+    conn = connect(path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+# ------------------------------------------------------
+# upsert（內容 hash 相同就不寫）
+# ------------------------------------------------------
+def sync_manual(conn, entries: list) -> int:
+    """整份覆蓋值（apply_taxonomy_and_price.load_overrides()，依列序）；回傳有變動的列數"""
+    ts, changed = now_ts(), 0
+    for seq, e in enumerate(entries):
+        text, h = _dump(e)
+        cur = conn.execute(
+            """INSERT INTO manual (seq, bgg_id, bgg_query, data, hash, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (seq) DO UPDATE SET
+                 bgg_id = excluded.bgg_id, bgg_query = excluded.bgg_query,
+                 data = excluded.data, hash = excluded.hash, updated_at = excluded.updated_at
+               WHERE manual.hash != excluded.hash""",
+            (seq, _int_or_none(e.get("bgg_id")), e.get("bgg_query"), text, h, ts),
+        )
+        changed += cur.rowcount
+    changed += conn.execute("DELETE FROM manual WHERE seq >= ?", (len(entries),)).rowcount
+    return changed
+
+
+def put_bgg(conn, rec: dict, replace: bool = True) -> bool:
+    """replace=False：已有這個 bgg_id 就不動（import 用，避免蓋掉 fetch 的原始紀錄）"""
+    text, h = _dump(rec)
+    conflict = """DO UPDATE SET
+             data = excluded.data, hash = excluded.hash, updated_at = excluded.updated_at
+           WHERE bgg.hash != excluded.hash""" if replace else "DO NOTHING"
+    cur = conn.execute(
+        f"""INSERT INTO bgg (bgg_id, data, hash, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (bgg_id) {conflict}""",
+        (int(rec["bgg_id"]), text, h, now_ts()),
+    )
+    return cur.rowcount > 0
+
+
+def record_fetch(conn, bgg_id: int, ok: bool, error: str | None = None):
+    conn.execute(
+        """INSERT INTO fetch_meta (bgg_id, status, attempts, fetched_at, error)
+           VALUES (?, ?, 1, ?, ?)
+           ON CONFLICT (bgg_id) DO UPDATE SET
+             status = excluded.status, attempts = fetch_meta.attempts + 1,
+             fetched_at = excluded.fetched_at, error = excluded.error""",
+        (int(bgg_id), "ok" if ok else "error", now_ts(), error),
+    )
+
+
+def put_image(conn, filename: str, **fields) -> None:
+    """只更新有給的欄位（bgg_id / source_url / sha1 / blurhash / color）"""
+    cols = [k for k in ("bgg_id", "source_url", "sha1", "blurhash", "color") if k in fields]
+    sets = ", ".join(f"{k} = excluded.{k}" for k in cols + ["updated_at"])
+    conn.execute(
+        f"""INSERT INTO images (filename, {", ".join(cols + ["updated_at"])})
+            VALUES (?, {", ".join("?" * (len(cols) + 1))})
+            ON CONFLICT (filename) DO UPDATE SET {sets}
+            WHERE {" OR ".join(f"images.{k} IS NOT excluded.{k}" for k in cols) or "0"}""",
+        (filename, *(fields[k] for k in cols), now_ts()),
+    )
+
+
+def put_game(conn, pos: int, row: dict) -> bool:
+    text, h = _dump(row)
+    cur = conn.execute(
+        """INSERT INTO games (pos, bgg_id, data, hash, updated_at) VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT (pos) DO UPDATE SET
+             bgg_id = excluded.bgg_id, data = excluded.data,
+             hash = excluded.hash, updated_at = excluded.updated_at
+           WHERE games.hash != excluded.hash""",
+        (pos, _int_or_none(row.get("bgg_id")), text, h, now_ts()),
+    )
+    return cur.rowcount > 0
+
+
+def trim_games(conn, count: int) -> int:
+    return conn.execute("DELETE FROM games WHERE pos >= ?", (count,)).rowcount
+
+
+def sync_games(conn, rows) -> int:
+    """整份網站紀錄（依輸出順序）；回傳有變動的列數"""
+    changed, n = 0, 0
+    for n, row in enumerate(rows, start=1):
+        changed += put_game(conn, n - 1, row)
+    return changed + trim_games(conn, n)
+
+
+# ------------------------------------------------------
+# 查詢
+# ------------------------------------------------------
+def iter_games(conn, bgg_ids=None):
+    """網站紀錄，依 pos；bgg_ids = 只取這些（走 games_bgg_id 索引）"""
+    if bgg_ids is None:
+        cur = conn.execute("SELECT data FROM games ORDER BY pos")
+    else:
+        ids = [int(b) for b in bgg_ids]
+        cur = conn.execute(
+            f"SELECT data FROM games WHERE bgg_id IN ({', '.join('?' * len(ids))}) ORDER BY pos", ids
+        )
+    for (text,) in cur:
+        yield json.loads(text)
+
+
+def bgg_record(conn, bgg_id: int) -> dict | None:
+    row = conn.execute("SELECT data FROM bgg WHERE bgg_id = ?", (int(bgg_id),)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def iter_bgg(conn):
+    for (text,) in conn.execute("SELECT data FROM bgg"):
+        yield json.loads(text)
+
+
+def image_placeholder(conn, image: str | None) -> dict:
+    """圖片路徑 → {"blurhash", "color"}（images 表，依檔名）；沒有就空"""
+    if not image:
+        return {}
+    row = conn.execute(
+        "SELECT blurhash, color FROM images WHERE filename = ?", (pathlib.PurePosixPath(image).name,)
+    ).fetchone()
+    return {"blurhash": row[0], "color": row[1]} if row else {}
+
+
+def manual_entries(conn, bgg_id: int) -> list:
+    cur = conn.execute("SELECT data FROM manual WHERE bgg_id = ? ORDER BY seq", (int(bgg_id),))
+    return [json.loads(t) for (t,) in cur]
+
+
+def manual_ids(conn) -> list:
+    """manual.csv 出現的 bgg_id（依第一次出現的列序）"""
+    cur = conn.execute(
+        "SELECT bgg_id FROM manual WHERE bgg_id IS NOT NULL GROUP BY bgg_id ORDER BY MIN(seq)"
+    )
+    return [b for (b,) in cur]
+
+
+# ------------------------------------------------------
+# 局部重建：bgg + manual → games
+# ------------------------------------------------------
+def live_ids(conn) -> list:
+    """會出現在網站上的 bgg_id：bgg_ids.txt（沒有這個檔就用 bgg 表）+ manual 才有的"""
+    from fetch_bgg import IDS_FILE, read_ids
+
+    if IDS_FILE.exists():
+        listed = read_ids()
+    else:
+        listed = [b for (b,) in conn.execute("SELECT bgg_id FROM bgg ORDER BY bgg_id")]
+    return list(dict.fromkeys(listed + manual_ids(conn)))
+
+
+def build_game(conn, bgg_id: int, cat_map: dict, mech_map: dict) -> dict | None:
+    """BGG 原始紀錄 + manual 覆蓋值 → apply_taxonomy_and_price.merge_game → build_row"""
+    from apply_taxonomy_and_price import merge_game
+    from build_json import build_row
+
+    raw = bgg_record(conn, bgg_id)
+    if raw is None:
+        return None
+    return build_row(merge_game(raw, manual_entries(conn, bgg_id), cat_map, mech_map),
+                     lambda image: image_placeholder(conn, image))
+
+
+def rebuild(conn, bgg_ids=None) -> int:
+    """bgg_ids=None：依 live_ids() 整份重排重建（寫入只限有變的列）；
+    否則只重建這些 ID：原位更新，新 ID 接在最後，不在 live_ids() 的刪掉"""
+    from apply_taxonomy_and_price import load_taxonomy
+
+    cat_map, mech_map = load_taxonomy()
+    live = live_ids(conn)
+    if bgg_ids is None:
+        rows = (build_game(conn, bid, cat_map, mech_map) for bid in live)
+        return sync_games(conn, (r for r in rows if r is not None))
+
+    live = set(live)
+    changed = 0
+    for bid in (int(b) for b in bgg_ids):
+        row = build_game(conn, bid, cat_map, mech_map) if bid in live else None
+        hit = conn.execute("SELECT pos FROM games WHERE bgg_id = ? ORDER BY pos", (bid,)).fetchall()
+        if row is None:
+            changed += conn.execute("DELETE FROM games WHERE bgg_id = ?", (bid,)).rowcount
+            continue
+        if hit:
+            pos = hit[0][0]
+            conn.executemany("DELETE FROM games WHERE pos = ?", hit[1:])
+        else:
+            pos = conn.execute("SELECT COALESCE(MAX(pos) + 1, 0) FROM games").fetchone()[0]
+        changed += put_game(conn, pos, row)
+    return changed
+
+
+# ------------------------------------------------------
+# import / export
+# ------------------------------------------------------
+def _load_json(path: pathlib.Path, default):
+    if not path.exists():
+        return default
+    return json.loads(path.read_text("utf-8"))
+
+
+def import_files(conn, games: bool = True) -> dict:
+    """manual = load_overrides()；bgg 只補沒有的（bgg_data.json 可能已套過覆蓋值，逐筆讀）；
+    images = image_placeholders.json；games=True 時 games = games_full.json"""
+    import image_placeholders
+    from apply_taxonomy_and_price import load_overrides
+    from build_json import OUT_FULL, SRC
+    from jsonstream import iter_records
+
+    counts = {"manual": sync_manual(conn, load_overrides())}
+    records = iter_records(SRC) if SRC.exists() else []
+    counts["bgg"] = sum(put_bgg(conn, g, replace=False) for g in records if g.get("bgg_id"))
+
+    placeholders = image_placeholders.load_map()
+    for name, ph in placeholders.items():
+        put_image(conn, name, blurhash=ph.get("blurhash"), color=ph.get("color"))
+    counts["images"] = len(placeholders)
+
+    if games and OUT_FULL.exists():
+        counts["games"] = sync_games(conn, _load_json(OUT_FULL, []))
+    return counts
+
+
+def export(conn) -> int:
+    from build_json import write_outputs
+
+    rows = list(iter_games(conn))
+    write_outputs(rows)
+    return len(rows)
+
+
+def stats(conn) -> dict:
+    out = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+           for t in ("manual", "bgg", "fetch_meta", "images", "games")}
+    out["fetch_errors"] = conn.execute(
+        "SELECT COUNT(*) FROM fetch_meta WHERE status = 'error'"
+    ).fetchone()[0]
+    return out
+
+
+def show(conn, bgg_id: int) -> dict:
+    meta = conn.execute(
+        "SELECT status, attempts, fetched_at, error FROM fetch_meta WHERE bgg_id = ?", (bgg_id,)
+    ).fetchone()
+    images = conn.execute(
+        "SELECT filename, source_url, sha1, blurhash, color FROM images WHERE bgg_id = ?", (bgg_id,)
+    ).fetchall()
+    return {
+        "manual": manual_entries(conn, bgg_id),
+        "bgg": bgg_record(conn, bgg_id),
+        "fetch_meta": dict(zip(("status", "attempts", "fetched_at", "error"), meta)) if meta else None,
+        "images": [dict(zip(("filename", "source_url", "sha1", "blurhash", "color"), r)) for r in images],
+        "games": list(iter_games(conn, [bgg_id])),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="catalog database (data/catalog.sqlite3)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("import")
+    p = sub.add_parser("rebuild")
+    p.add_argument("bgg_ids", nargs="*", type=int)
+    sub.add_parser("export")
+    p = sub.add_parser("show")
+    p.add_argument("bgg_id", type=int)
+    sub.add_parser("stats")
+    args = ap.parse_args()
+
+    with session() as conn:
+        if args.cmd == "import":
+            log(f"import 變動：{import_files(conn)}")
+        elif args.cmd == "rebuild":
+            n = rebuild(conn, args.bgg_ids or None)
+            log(f"rebuild：{n} 列變動")
+        elif args.cmd == "export":
+            log(f"export {export(conn)} 筆")
+        elif args.cmd == "show":
+            print(json.dumps(show(conn, args.bgg_id), ensure_ascii=False, indent=2))
+        elif args.cmd == "stats":
+            print(json.dumps(stats(conn), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
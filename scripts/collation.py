@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+collation.py — 中文（zh-Hant）排序 key
+
+- 有 PyICU：用 ICU 的 zh-Hant collator，結果與瀏覽器
+  localeCompare(..., 'zh-Hant') 相同
+- 沒有 PyICU：退回（小寫後的）code point 排序（HAS_ICU = False，前端可據此自行重排）
+"""
+
+try:
+    import icu  # PyICU（選用）
+except ImportError:
+    icu = None
+
+HAS_ICU = icu is not None
+COLLATION = "icu:zh-Hant" if HAS_ICU else "codepoint"
+
+_collator = icu.Collator.createInstance(icu.Locale("zh_Hant")) if HAS_ICU else None
+
+
+def zh_sort_key(s: str):
+    """sorted(..., key=zh_sort_key)"""
+    if _collator is not None:
+        return _collator.getSortKey(s)
+    return s.lower()
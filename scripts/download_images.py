@@ -12,9 +12,15 @@ download_images.py
   - 若 image_override 存在 → 優先使用
   - 若已有檔案 → 不再下載（安全）
   - 全程 https，BGG URL 自動修正
+  - 檔名 → bgg_id / 來源 URL 記進 catalog_db 的 images 表
+  - 下載完接著跑 image_placeholders.py（blurhash + 主色，有快取）
 """
 
-import json, pathlib, hashlib, requests, time, csv
+import json, pathlib, hashlib, requests, time
+
+import catalog_db
+import image_placeholders
+from manual_csv import load_manual
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 DATA_MANUAL = ROOT / "data" / "manual.csv"
@@ -50,16 +56,11 @@ def fix_url(url: str):
 # -------------------------------------------------------------
 def load_manual_override():
     override = {}
-    if not DATA_MANUAL.exists():
-        return override
-
-    with DATA_MANUAL.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            bid = row.get("bgg_id")
-            img = row.get("image_override")
-            if bid and img:
-                override[str(int(float(bid)))] = img.strip()
+    for row in load_manual(DATA_MANUAL):
+        bid = row.get("bgg_id")
+        img = row.get("image_override")
+        if bid and img:
+            override[str(bid)] = img
     return override
 
 
@@ -77,6 +78,8 @@ def main():
     rows = json.loads(DATA_BGG.read_text("utf-8"))
     log(f"BGG rows: {len(rows)}")
 
+    sources = {}  # 檔名 → (bgg_id, 來源 URL)
+
     for idx, g in enumerate(rows, start=1):
         bid = str(g.get("bgg_id"))
         if not bid:
@@ -97,6 +100,7 @@ def main():
         # 檔名: <bgg_id>-<md5>.jpg
         fn = f"{bid}-{md5(src)}.jpg"
         out = IMG_DIR / fn
+        sources[fn] = (g.get("bgg_id"), src)
 
         if out.exists():
             log(f"[{idx}] {fn} 已存在，跳過")
@@ -116,6 +120,12 @@ def main():
 
     log("全部圖片處理完成")
 
+    with catalog_db.session() as db:
+        for fn, (bid, src) in sources.items():
+            catalog_db.put_image(db, fn, bgg_id=bid, source_url=src)
+
+    image_placeholders.main()
+
 
 if __name__ == "__main__":
     main()
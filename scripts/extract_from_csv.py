@@ -6,9 +6,10 @@ extract_from_csv.py
 CSV 欄位：name_zh,bgg_id,...
 """
 
-import csv
 import pathlib
 
+from manual_csv import load_manual
+
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 CSV_PATH = ROOT / "data" / "manual.csv"  # 你 CSV 的檔名
 OUT = ROOT / "data" / "bgg_ids.txt"
@@ -20,12 +21,9 @@ def main():
 
     ids = set()
 
-    with CSV_PATH.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            bid = row.get("bgg_id")
-            if bid and bid.isdigit():
-                ids.add(int(bid))
+    for row in load_manual(CSV_PATH):
+        if row.get("bgg_id"):
+            ids.add(row["bgg_id"])
 
     ids = sorted(ids)
 
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+facets.py — 分類 / 機制 facet 索引
+
+對每個 facet（categories / mechanisms）輸出：
+  - terms    排好序的詞（zh-Hant 排序；見 collation.py）
+  - counts   每個詞在全部資料中的筆數
+  - bitmaps  每個詞一個 bitset（base64）；第 i 個 bit = games 陣列第 i 筆有此詞
+             bit i 在 byte i>>3 的第 (i & 7) 個 bit（little-endian）
+
+前端篩選 = bitmap AND；目前結果的各詞數量 = popcount(詞 bitmap AND 結果 bitmap)。
+位置對應同一版本的 games.<ver>.json，由 versioned_assets.publish 一起發佈。
+"""
+
+import base64
+
+from collation import COLLATION, zh_sort_key
+
+
+def cats_of(g: dict) -> list:
+    return g.get("categories_zh") or g.get("categories") or []
+
+
+def mechs_of(g: dict) -> list:
+    return g.get("mechanisms_zh") or g.get("mechanisms") or []
+
+
+FACETS = {
+    "categories": cats_of,
+    "mechanisms": mechs_of,
+}
+
+
+def build_facet(rows: list, pick) -> dict:
+    size = (len(rows) + 7) // 8
+    bits = {}
+    for i, g in enumerate(rows):
+        for t in set(pick(g)):
+            b = bits.get(t)
+            if b is None:
+                b = bits[t] = bytearray(size)
+            b[i >> 3] |= 1 << (i & 7)
+
+    terms = sorted(bits, key=zh_sort_key)
+    return {
+        "terms": terms,
+        "counts": [sum(bin(x).count("1") for x in bits[t]) for t in terms],
+        "bitmaps": [base64.b64encode(bytes(bits[t])).decode("ascii") for t in terms],
+    }
+
+
+def build_facets(rows: list) -> dict:
+    out = {"collation": COLLATION, "count": len(rows)}
+    for name, pick in FACETS.items():
+        out[name] = build_facet(rows, pick)
+    return out
@@ -6,13 +6,27 @@ fetch_bgg.py
 → 呼叫 BGG API（含 X-API-Key）
 → 安全 retry、防 rate limit
 → 產生 data/bgg_data.json
+
+分片 / 續抓：
+  python3 scripts/fetch_bgg.py                 # 全部 ID（= --shard 1/1 + merge）
+  python3 scripts/fetch_bgg.py --shard 2/4     # 只抓 bgg_id % 4 == 1 的 ID
+  python3 scripts/fetch_bgg.py --merge         # 合併 data/bgg_shards/shard-*-of-<n>.jsonl → bgg_data.json
+每抓到一筆就 append 進 data/bgg_shards/shard-<i>-of-<n>.jsonl（checkpoint），
+中斷後重跑同一個 shard 會跳過已抓到的 ID（寫到一半的最後一行先截掉）；--fresh 則忽略舊 checkpoint 重抓。
+--merge 只合併同一個 n 的分片（有多種 n 時要用 --of 指定）；
+bgg_ids.txt 有 ID 沒抓到就列出來並以非 0 結束，除非加 --allow-partial
+（不分片時同樣檢查；失敗時保留 checkpoint，重跑只補抓缺的 ID）。
+每筆結果同時寫進 catalog_db（bgg + fetch_meta，一筆一個 transaction）。
 """
 
-import json, time, hashlib, pathlib, requests, sys
+import argparse, json, re, time, hashlib, pathlib, requests, sys
+
+import catalog_db
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 IDS_FILE = ROOT / "data" / "bgg_ids.txt"
 OUT_FILE = ROOT / "data" / "bgg_data.json"
+SHARD_DIR = ROOT / "data" / "bgg_shards"
 
 API_URL = "https://api.geekdo.com/xmlapi2/thing?id={}&stats=1"
 
@@ -117,45 +131,218 @@ def parse_xml_to_dict(xml: str):
     return out
 
 
-def main():
-    if not IDS_FILE.exists():
-        log("找不到 data/bgg_ids.txt")
-        sys.exit(1)
+def fetch_one(gid: int):
+    """抓單一 ID → dict；失敗回傳 None"""
+    xml = safe_get(API_URL.format(gid))
+    if not xml:
+        log(f"ID {gid} 抓取失敗，跳過")
+        return None
+    try:
+        return parse_xml_to_dict(xml)
+    except Exception as e:
+        log(f"解析失敗 {gid}: {e}")
+        return None
+
 
+def read_ids(path: pathlib.Path = IDS_FILE) -> list:
+    """bgg_ids.txt → [int]；檔案不存在回傳 []"""
     ids = []
-    with open(IDS_FILE, "r", encoding="utf-8") as f:
+    if not path.exists():
+        return ids
+    with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if line and line.isdigit():
                 ids.append(int(line))
+    return ids
 
-    log(f"載入 BGG ID 數量：{len(ids)}")
 
-    rows = []
-    for idx, gid in enumerate(ids, start=1):
-        log(f"[{idx}/{len(ids)}] Fetch {gid}")
+def load_ids() -> list:
+    if not IDS_FILE.exists():
+        log("找不到 data/bgg_ids.txt")
+        sys.exit(1)
+    return read_ids(IDS_FILE)
 
-        xml = safe_get(API_URL.format(gid))
-        if not xml:
-            log(f"ID {gid} 抓取失敗，跳過")
-            continue
 
-        try:
-            rec = parse_xml_to_dict(xml)
+def parse_shard(spec: str):
+    """'2/4' → (2, 4)；i 從 1 起算"""
+    try:
+        i, n = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise SystemExit(f"--shard 格式應為 i/n（例如 2/4）：{spec}")
+    if not 1 <= i <= n:
+        raise SystemExit(f"--shard 需要 1 <= i <= n：{spec}")
+    return i, n
+
+
+def shard_ids(ids: list, i: int, n: int) -> list:
+    """依 bgg_id 分片：與 bgg_ids.txt 的順序 / 增刪無關，同一個 ID 永遠在同一片"""
+    return [gid for gid in ids if gid % n == i - 1]
+
+
+def shard_file(i: int, n: int) -> pathlib.Path:
+    return SHARD_DIR / f"shard-{i}-of-{n}.jsonl"
+
+
+_SHARD_RE = re.compile(r"shard-(\d+)-of-(\d+)\.jsonl")
+
+
+def shard_files(n: int | None = None) -> list:
+    """同一個 n 的分片檔，依 i 排序；n=None 時目錄裡只能有一種 n"""
+    found = {}
+    for p in SHARD_DIR.glob("shard-*-of-*.jsonl"):
+        m = _SHARD_RE.fullmatch(p.name)
+        if m:
+            found.setdefault(int(m.group(2)), []).append((int(m.group(1)), p))
+    if n is None:
+        if len(found) > 1:
+            raise SystemExit(f"data/bgg_shards/ 有多種分片數 {sorted(found)}，請用 --of 指定")
+        n = next(iter(found), None)
+    return [p for _, p in sorted(found.get(n, []))]
+
+
+def read_checkpoint(path: pathlib.Path) -> dict:
+    """bgg_id → record；最後一行若因中斷寫到一半就略過"""
+    out = {}
+    if not path.exists():
+        return out
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(rec, dict) and rec.get("bgg_id"):
+                out[rec["bgg_id"]] = rec
+    return out
+
+
+def truncate_partial(path: pathlib.Path):
+    """中斷時最後一行可能只寫了一半：截回最後一個換行，續抓才不會接在殘行後面"""
+    if not path.exists():
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, 2)
+        pos = end
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            nl = chunk.rfind(b"\n")
+            if nl >= 0:
+                pos = pos - step + nl + 1
+                break
+            pos -= step
+        if pos < end:
+            f.truncate(pos)
+            log(f"{path.name}：截掉未寫完的最後 {end - pos} bytes")
+
+
+def fetch_shard(ids: list, path: pathlib.Path, fresh: bool = False) -> int:
+    """抓 ids → append 到 path；回傳本次新抓到的筆數"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fresh:
+        path.unlink(missing_ok=True)
+    truncate_partial(path)
+
+    done = read_checkpoint(path)
+    todo = [gid for gid in ids if gid not in done]
+    log(f"{path.name}：共 {len(ids)}，已完成 {len(ids) - len(todo)}，待抓 {len(todo)}")
+
+    n = 0
+    db = catalog_db.connect()
+    with open(path, "a", encoding="utf-8") as out:
+        for idx, gid in enumerate(todo, start=1):
+            log(f"[{idx}/{len(todo)}] Fetch {gid}")
+
+            rec = fetch_one(gid)
+            with db:
+                catalog_db.record_fetch(db, gid, ok=bool(rec), error=None if rec else "fetch failed")
+                if rec:
+                    catalog_db.put_bgg(db, rec)
             if rec:
-                rows.append(rec)
-        except Exception as e:
-            log(f"解析失敗 {gid}: {e}")
+                out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                out.flush()
+                n += 1
+
+            time.sleep(1)  # 保護 API
+    db.close()
+    return n
+
+
+def merge(paths: list, ids: list) -> list:
+    """依 bgg_id 合併；只留 bgg_ids.txt 裡的 ID，順序也依它。
+    同一個 n 的分片 ID 不重疊；同一檔內重複（重抓）以後寫入的為準"""
+    merged = {}
+    for p in paths:
+        merged.update(read_checkpoint(p))
+    return [merged[gid] for gid in dict.fromkeys(ids) if gid in merged]
+
 
-        time.sleep(1)  # 保護 API
-        
-    # 寫出結果
+def missing_ids(rows: list, ids: list) -> list:
+    got = {r["bgg_id"] for r in rows}
+    return [gid for gid in dict.fromkeys(ids) if gid not in got]
+
+
+def check_missing(rows: list, ids: list, allow_partial: bool, hint: str):
+    """bgg_ids.txt 有 ID 沒抓到：列出來；沒加 --allow-partial 就不寫出、以非 0 結束"""
+    missing = missing_ids(rows, ids)
+    if not missing:
+        return
+    log(f"缺 {len(missing)} / {len(dict.fromkeys(ids))} 個 ID：{missing[:20]}{' …' if len(missing) > 20 else ''}")
+    if not allow_partial:
+        log(f"不寫出 bgg_data.json（{hint}，或加 --allow-partial）")
+        sys.exit(1)
+
+
+def write_output(rows: list):
     OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
     with open(OUT_FILE, "w", encoding="utf-8") as f:
         json.dump(rows, f, ensure_ascii=False, indent=2)
-
     log(f"完成，共寫入 {len(rows)} 筆 → {OUT_FILE}")
 
 
+def main():
+    ap = argparse.ArgumentParser(description="fetch BGG things for data/bgg_ids.txt")
+    ap.add_argument("--shard", metavar="i/n", help="只抓第 i 片（共 n 片，i 從 1 起算）")
+    ap.add_argument("--merge", action="store_true", help="合併 data/bgg_shards/*.jsonl → bgg_data.json")
+    ap.add_argument("--of", type=int, metavar="n", help="--merge 只合併 shard-*-of-<n>.jsonl")
+    ap.add_argument("--allow-partial", action="store_true", help="允許缺 ID（照樣寫出 bgg_data.json）")
+    ap.add_argument("--clean", action="store_true", help="--merge 後刪掉分片檔")
+    ap.add_argument("--fresh", action="store_true", help="忽略既有 checkpoint，整片重抓")
+    args = ap.parse_args()
+
+    ids = load_ids()
+    log(f"載入 BGG ID 數量：{len(ids)}")
+
+    if args.merge:
+        paths = shard_files(args.of)
+        if not paths:
+            log("data/bgg_shards/ 沒有分片檔")
+            sys.exit(1)
+        rows = merge(paths, ids)
+        check_missing(rows, ids, args.allow_partial, "確認分片都跑完")
+        write_output(rows)
+        if args.clean:
+            for p in paths:
+                p.unlink()
+        return
+
+    if args.shard:
+        i, n = parse_shard(args.shard)
+        path = shard_file(i, n)
+        got = fetch_shard(shard_ids(ids, i, n), path, fresh=args.fresh)
+        log(f"shard {i}/{n} 本次新增 {got} 筆 → {path}")
+        return
+
+    # 不分片：自己就是 1/1，跑完直接寫出並清掉 checkpoint（缺 ID 時保留，重跑只補抓）
+    path = shard_file(1, 1)
+    fetch_shard(ids, path, fresh=args.fresh)
+    rows = merge([path], ids)
+    check_missing(rows, ids, args.allow_partial, f"重跑會從 {path.name} 續抓")
+    write_output(rows)
+    path.unlink()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+history.py — 價格 / 庫存 / BGG 評分 變動紀錄（append-only）
+
+每次 build 後比對 games_full.json 與「目前已知狀態」，只記下有變的欄位：
+  data/history/log.jsonl     一行一筆 {"t": build 時間, "id": bgg_id, "f": {欄位: 新值}}
+  data/history/compact.json  壓實後的欄位式儲存（依 bgg_id, t 排序 + 每個 id 的起訖位置
+                             + 依時間排序的列號 by_t 與每個 build 在 by_t 中的起點 t_start）
+
+log 超過 COMPACT_EVERY 行時自動併進 compact.json 並清空 log。
+已知狀態 = compact 中每個欄位的最後值 + log 重播，不另存完整快照。
+
+用法：
+  python3 scripts/history.py record                 # build 後呼叫
+  python3 scripts/history.py compact
+  python3 scripts/history.py show <bgg_id> [--field price_twd]
+  python3 scripts/history.py since 2025-11-01
+"""
+
+import argparse, bisect, json, pathlib
+from datetime import datetime, timezone
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "data" / "games_full.json"
+HIST_DIR = ROOT / "data" / "history"
+LOG = HIST_DIR / "log.jsonl"
+COMPACT = HIST_DIR / "compact.json"
+
+COMPACT_EVERY = 5000
+
+# listed：1 = 在目錄中，0 = 已下架（從 games_full.json 消失）
+FIELDS = [
+    "listed",
+    "price_msrp_twd", "price_twd", "used_price_twd", "stock",
+    "rating_bayes", "rating_avg", "users_rated", "weight",
+]
+
+
+def log(msg):
+    print(f"[history] {msg}")
+
+
+def now_ts() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+# ------------------------------------------------------
+# 讀取
+# ------------------------------------------------------
+def load_compact() -> dict:
+    if not COMPACT.exists():
+        return {"fields": FIELDS, "times": [], "ids": [], "index": {},
+                "by_t": [], "t_start": [],
+                "cols": {"t": [], "id": [], "f": [], "v": []}}
+    return json.loads(COMPACT.read_text("utf-8"))
+
+
+def iter_compact(c: dict, rows=None):
+    """(t, bgg_id, field, value)；rows = 只讀這個區間（range）"""
+    cols = c["cols"]
+    rng = rows if rows is not None else range(len(cols["t"]))
+    for k in rng:
+        yield c["times"][cols["t"][k]], c["ids"][cols["id"][k]], c["fields"][cols["f"][k]], cols["v"][k]
+
+
+def iter_log():
+    if not LOG.exists():
+        return
+    with LOG.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            for field, v in rec["f"].items():
+                yield rec["t"], rec["id"], field, v
+
+
+def iter_all():
+    yield from iter_compact(load_compact())
+    yield from iter_log()
+
+
+def current_state() -> dict:
+    state = {}
+    for _, bid, field, v in iter_all():
+        state.setdefault(bid, {})[field] = v
+    return state
+
+
+# ------------------------------------------------------
+# 寫入
+# ------------------------------------------------------
+def snapshot(rows: list) -> dict:
+    out = {}
+    for r in rows:
+        bid = r.get("bgg_id")
+        if not bid:
+            continue
+        bid = int(bid)
+        if bid in out:
+            continue
+        s = {k: r.get(k) for k in FIELDS if k != "listed"}
+        s["listed"] = 1
+        out[bid] = s
+    return out
+
+
+def record(rows: list, ts: str | None = None) -> int:
+    """只 append 有變動的欄位；回傳寫入的紀錄數"""
+    ts = ts or now_ts()
+    before = {str(k): v for k, v in current_state().items()}
+    after = snapshot(rows)
+
+    lines = []
+    for bid, s in after.items():
+        old = before.pop(str(bid), {})
+        changed = {k: v for k, v in s.items()
+                   if (k in old and old[k] != v) or (k not in old and v is not None)}
+        if changed:
+            lines.append({"t": ts, "id": bid, "f": changed})
+    for bid, old in before.items():
+        if old.get("listed") == 1:
+            lines.append({"t": ts, "id": int(bid), "f": {"listed": 0}})
+
+    if lines:
+        HIST_DIR.mkdir(parents=True, exist_ok=True)
+        with LOG.open("a", encoding="utf-8") as f:
+            for rec in lines:
+                f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+    log(f"{ts} ; changed games={len(lines)}")
+
+    if LOG.exists():
+        with LOG.open("rb") as f:
+            n = sum(1 for _ in f)
+        if n >= COMPACT_EVERY:
+            compact()
+    return len(lines)
+
+
+def compact():
+    """compact.json + log.jsonl → 新的 compact.json，清空 log"""
+    entries = sorted(set(
+        (t, bid, field, json.dumps(v))
+        for t, bid, field, v in iter_all()
+    ), key=lambda e: (e[1], e[0], FIELDS.index(e[2]) if e[2] in FIELDS else len(FIELDS)))
+
+    fields = list(FIELDS) + sorted({e[2] for e in entries} - set(FIELDS))
+    times = sorted({e[0] for e in entries})
+    ids = sorted({e[1] for e in entries})
+    t_ix = {t: i for i, t in enumerate(times)}
+    id_ix = {b: i for i, b in enumerate(ids)}
+    f_ix = {f: i for i, f in enumerate(fields)}
+
+    cols = {"t": [], "id": [], "f": [], "v": []}
+    index = {}
+    for k, (t, bid, field, v) in enumerate(entries):
+        cols["t"].append(t_ix[t])
+        cols["id"].append(id_ix[bid])
+        cols["f"].append(f_ix[field])
+        cols["v"].append(json.loads(v))
+        start, _ = index.get(str(bid), (k, k))
+        index[str(bid)] = (start, k + 1)
+
+    # 時間索引：by_t = 依 (t, 列號) 排序的列號；t_start[i] = times[i] 在 by_t 的起點
+    by_t = sorted(range(len(entries)), key=lambda k: (cols["t"][k], k))
+    t_start, k = [], 0
+    for ti in range(len(times)):
+        t_start.append(k)
+        while k < len(by_t) and cols["t"][by_t[k]] == ti:
+            k += 1
+
+    HIST_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = COMPACT.with_suffix(".tmp")
+    tmp.write_text(json.dumps(
+        {"fields": fields, "times": times, "ids": ids, "index": index,
+         "by_t": by_t, "t_start": t_start, "cols": cols},
+        ensure_ascii=False, separators=(",", ":")
+    ), "utf-8")
+    tmp.replace(COMPACT)
+    LOG.write_text("", "utf-8")
+    log(f"compacted {len(entries)} entries ; games={len(ids)} ; builds={len(times)}")
+
+
+# ------------------------------------------------------
+# 查詢
+# ------------------------------------------------------
+def game_history(bid: int, field: str | None = None) -> list:
+    """某款遊戲的變動（依時間）：[(t, field, value)]"""
+    bid = int(bid)
+    c = load_compact()
+    span = c["index"].get(str(bid))
+    out = []
+    if span:
+        out.extend(iter_compact(c, range(*span)))
+    out.extend(e for e in iter_log() if e[1] == bid)
+    return [(t, f, v) for t, _, f, v in out if field is None or f == field]
+
+
+def changed_since(date: str) -> dict:
+    """date（ISO 日期或時間）之後的所有變動：{bgg_id: [(t, field, value)]}"""
+    out = {}
+    c = load_compact()
+    first = bisect.bisect_left(c["times"], date)
+    if "by_t" in c:
+        hits = c["by_t"][c["t_start"][first]:] if first < len(c["times"]) else []
+    else:
+        # 舊格式（沒有時間索引）：掃整個 t 欄，下次 compact 會補上索引
+        hits = [k for k, ti in enumerate(c["cols"]["t"]) if ti >= first]
+    for t, bid, field, v in list(iter_compact(c, hits)) + [e for e in iter_log() if e[0] >= date]:
+        out.setdefault(bid, []).append((t, field, v))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="price / stock / rating history")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("record")
+    sub.add_parser("compact")
+    p = sub.add_parser("show")
+    p.add_argument("bgg_id", type=int)
+    p.add_argument("--field")
+    p = sub.add_parser("since")
+    p.add_argument("date")
+    args = ap.parse_args()
+
+    if args.cmd == "record":
+        if not SRC.exists():
+            log("找不到 games_full.json，跳過")
+            return
+        record(json.loads(SRC.read_text("utf-8")))
+    elif args.cmd == "compact":
+        compact()
+    elif args.cmd == "show":
+        for t, f, v in game_history(args.bgg_id, args.field):
+            print(f"{t}  {f:<16} {v}")
+    elif args.cmd == "since":
+        for bid, changes in sorted(changed_since(args.date).items()):
+            for t, f, v in changes:
+                print(f"{bid:>8}  {t}  {f:<16} {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+image_placeholders.py — 封面的低畫質佔位圖（blurhash）+ 主色
+
+對 site/assets/img/ 下每張封面：
+  - blurhash（4x3 components，約 28 字元）
+  - 主色（#rrggbb）
+用 Pillow + process pool 計算；結果以「圖片內容 sha1」快取在
+data/.cache/placeholders.json，圖沒變就不重算。
+
+輸出 data/image_placeholders.json：{檔名: {"blurhash": ..., "color": ...}}
+（同時 upsert 進 catalog_db 的 images 表：sha1 / blurhash / color）
+build_json.py 依 image 檔名把這兩個欄位寫進每筆資料，前端先畫佔位再載圖。
+"""
+
+import hashlib, io, json, math, os, pathlib
+from concurrent.futures import ProcessPoolExecutor
+
+import catalog_db
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+IMG_DIR = ROOT / "site" / "assets" / "img"
+CACHE = ROOT / "data" / ".cache" / "placeholders.json"
+OUT = ROOT / "data" / "image_placeholders.json"
+
+IMG_EXTS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+COMPONENTS = (4, 3)
+SAMPLE = 32  # blurhash 取樣邊長
+
+
+def log(msg):
+    print(f"[placeholder] {msg}")
+
+
+# ------------------------------------------------------
+# blurhash（https://github.com/woltapp/blurhash 演算法）
+# ------------------------------------------------------
+_B83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _b83(value: int, length: int) -> str:
+    return "".join(_B83[(value // 83 ** (length - 1 - i)) % 83] for i in range(length))
+
+
+def _to_linear(v: int) -> float:
+    v = v / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _to_srgb(v: float) -> int:
+    v = max(0.0, min(1.0, v))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(v: float, e: float) -> float:
+    return math.copysign(abs(v) ** e, v)
+
+
+def blurhash(pixels: list, w: int, h: int, cx: int = 4, cy: int = 3) -> str:
+    lin = [(_to_linear(r), _to_linear(g), _to_linear(b)) for r, g, b in pixels]
+    cos_x = [[math.cos(math.pi * i * x / w) for x in range(w)] for i in range(cx)]
+    cos_y = [[math.cos(math.pi * j * y / h) for y in range(h)] for j in range(cy)]
+
+    factors = []
+    for j in range(cy):
+        for i in range(cx):
+            norm = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(h):
+                fy = norm * cos_y[j][y]
+                row = y * w
+                for x in range(w):
+                    basis = fy * cos_x[i][x]
+                    pr, pg, pb = lin[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = 1 / (w * h)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    out = _b83((cx - 1) + (cy - 1) * 9, 1)
+    if ac:
+        q = max(0, min(82, int(max(abs(v) for f in ac for v in f) * 166 - 0.5)))
+        max_val = (q + 1) / 166
+        out += _b83(q, 1)
+    else:
+        max_val = 1
+        out += _b83(0, 1)
+
+    out += _b83((_to_srgb(dc[0]) << 16) + (_to_srgb(dc[1]) << 8) + _to_srgb(dc[2]), 4)
+    for f in ac:
+        qr, qg, qb = (max(0, min(18, int(math.floor(_sign_pow(v / max_val, 0.5) * 9 + 9.5)))) for v in f)
+        out += _b83(qr * 19 * 19 + qg * 19 + qb, 2)
+    return out
+
+
+# ------------------------------------------------------
+# 單張圖（在子 process 執行）
+# ------------------------------------------------------
+def compute(data: bytes) -> dict:
+    from PIL import Image  # 只有這個 stage 需要 Pillow
+
+    with Image.open(io.BytesIO(data)) as im:
+        im = im.convert("RGB")
+
+        small = im.resize((SAMPLE, SAMPLE), Image.BILINEAR)
+        raw = small.tobytes()
+        pixels = [tuple(raw[k:k + 3]) for k in range(0, len(raw), 3)]
+        bh = blurhash(pixels, SAMPLE, SAMPLE, *COMPONENTS)
+
+        pal = im.resize((64, 64), Image.BILINEAR).quantize(colors=5)
+        count, idx = max(pal.getcolors())
+        r, g, b = pal.getpalette()[idx * 3: idx * 3 + 3]
+
+    return {"blurhash": bh, "color": f"#{r:02x}{g:02x}{b:02x}"}
+
+
+def _compute_file(path: str):
+    try:
+        return compute(pathlib.Path(path).read_bytes())
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# ------------------------------------------------------
+# 主流程
+# ------------------------------------------------------
+def _load_json(path: pathlib.Path) -> dict:
+    try:
+        return json.loads(path.read_text("utf-8"))
+    except Exception:
+        return {}
+
+
+def load_map() -> dict:
+    """檔名 → {"blurhash", "color"}（build_json 使用）"""
+    return _load_json(OUT)
+
+
+def main():
+    if not IMG_DIR.exists():
+        log("找不到 site/assets/img，跳過")
+        return
+
+    files = sorted(p for p in IMG_DIR.iterdir() if p.suffix.lower() in IMG_EXTS)
+    cache = _load_json(CACHE)
+
+    digests = {p.name: hashlib.sha1(p.read_bytes()).hexdigest() for p in files}
+    todo = {}
+    for p in files:
+        if digests[p.name] not in cache:
+            todo.setdefault(digests[p.name], str(p))
+    log(f"images={len(files)} ; unique={len(set(digests.values()))} ; compute={len(todo)}")
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=os.cpu_count() or 2) as pool:
+            results = pool.map(_compute_file, todo.values(), chunksize=8)
+            for digest, res in zip(todo, results):
+                if "error" in res:
+                    log(f"  {pathlib.Path(todo[digest]).name}: {res['error']}")
+                    continue
+                cache[digest] = res
+
+        CACHE.parent.mkdir(parents=True, exist_ok=True)
+        CACHE.write_text(json.dumps(cache, ensure_ascii=False), "utf-8")
+
+    out = {name: cache[d] for name, d in digests.items() if d in cache}
+    OUT.write_text(json.dumps(out, ensure_ascii=False, indent=2, sort_keys=True), "utf-8")
+
+    with catalog_db.session() as db:
+        for name, d in digests.items():
+            ph = cache.get(d, {})
+            catalog_db.put_image(db, name, sha1=d, blurhash=ph.get("blurhash"), color=ph.get("color"))
+    log(f"完成 → {OUT}（{len(out)} 筆）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+jsonstream.py — 一筆一筆讀 / 寫 JSON 陣列（--stream 模式用）
+
+讀：
+  iter_records(path)
+    - *.jsonl：一行一筆
+    - 其他：頂層 JSON 陣列，逐段讀入、逐筆 raw_decode，不會整份載入
+
+寫：
+  with RecordWriter(path, indent=2) as w: w.write(rec)
+    - 先寫到暫存檔，close 時才取代原檔（讀寫同一檔案也安全）
+    - indent=2 / None 的輸出與 json.dumps(list, ensure_ascii=False, indent=...) 逐字相同
+    - *.jsonl：一行一筆
+"""
+
+import json, pathlib
+
+CHUNK = 1 << 16
+_WS = " \t\r\n"
+
+
+class StreamError(ValueError):
+    pass
+
+
+def _iter_jsonl(path: pathlib.Path):
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _iter_array(path: pathlib.Path):
+    dec = json.JSONDecoder()
+    with path.open("r", encoding="utf-8-sig") as f:
+        buf, pos, eof = "", 0, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(CHUNK)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WS:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        skip_ws()
+        if pos >= len(buf) or buf[pos] != "[":
+            raise StreamError(f"{path}: 頂層不是 JSON 陣列")
+        pos += 1
+
+        first = True
+        while True:
+            skip_ws()
+            if pos >= len(buf):
+                raise StreamError(f"{path}: 陣列沒有結尾")
+            if buf[pos] == "]":
+                return
+            if not first:
+                if buf[pos] != ",":
+                    raise StreamError(f"{path}: 預期 ',' 在第 {pos} 字元")
+                pos += 1
+                skip_ws()
+            first = False
+
+            while True:
+                try:
+                    obj, end = dec.raw_decode(buf, pos)
+                    # 數字等 scalar 可能剛好被 chunk 切斷 → 後面要還有字元才算完整
+                    if end < len(buf) or eof:
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+            pos = end
+            yield obj
+
+
+def iter_records(path: pathlib.Path):
+    path = pathlib.Path(path)
+    if path.suffix == ".jsonl":
+        return _iter_jsonl(path)
+    return _iter_array(path)
+
+
+def is_array(path: pathlib.Path) -> bool:
+    """頂層是不是 JSON 陣列（只看第一個非空白字元）"""
+    path = pathlib.Path(path)
+    if path.suffix == ".jsonl":
+        return True
+    with path.open("r", encoding="utf-8-sig") as f:
+        while True:
+            ch = f.read(1)
+            if not ch:
+                return False
+            if ch not in _WS:
+                return ch == "["
+
+
+class RecordWriter:
+    def __init__(self, path: pathlib.Path, indent: int | None = None):
+        self.path = pathlib.Path(path)
+        self.indent = indent
+        self.jsonl = self.path.suffix == ".jsonl"
+        self.count = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp = self.path.with_name(self.path.name + ".tmp")
+        self.f = self.tmp.open("w", encoding="utf-8")
+        if not self.jsonl:
+            self.f.write("[")
+
+    def write(self, rec):
+        if self.jsonl:
+            self.f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        elif self.indent is None:
+            self.f.write((", " if self.count else "") + json.dumps(rec, ensure_ascii=False))
+        else:
+            pad = " " * self.indent
+            s = json.dumps(rec, ensure_ascii=False, indent=self.indent)
+            self.f.write(("," if self.count else "") + "\n" + pad + s.replace("\n", "\n" + pad))
+        self.count += 1
+
+    def close(self):
+        if not self.jsonl:
+            self.f.write("\n]" if self.count and self.indent is not None else "]")
+        self.f.close()
+        self.tmp.replace(self.path)
+
+    def abort(self):
+        self.f.close()
+        self.tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_records(path: pathlib.Path, records, indent: int | None = None) -> int:
+    with RecordWriter(path, indent=indent) as w:
+        for rec in records:
+            w.write(rec)
+    return w.count
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+manual_csv.py — manual.csv 唯一的讀取入口
+
+規則（所有 script 共用）：
+  - UTF-8，容忍 BOM
+  - 沒有欄名的欄位（CSV 尾端多出的逗號）直接丟掉
+  - 字串一律 strip，空字串 → None
+  - bgg_id / 價格 / 庫存 → int（"117814"、"117814.0" 都接受；解析不了 → None）
+
+解析結果以 pickle 快照存在 data/.cache/manual.pickle，
+key = manual.csv 內容的 sha256；檔案沒變就直接載入快照，不再重新 parse。
+
+用法：
+  from manual_csv import load_manual
+  rows = load_manual()          # list[dict]
+"""
+
+import csv, hashlib, io, pathlib, pickle
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+MANUAL = ROOT / "data" / "manual.csv"
+CACHE = ROOT / "data" / ".cache" / "manual.pickle"
+
+# 解析規則改了就把版本 +1，舊快照自動失效
+SCHEMA = 1
+
+INT_FIELDS = ("bgg_id", "price_msrp_twd", "price_twd", "used_price_twd", "stock")
+
+
+def to_int(x):
+    if x is None: return None
+    s = str(x).strip()
+    if s == "" or s.lower() == "none": return None
+    try: return int(float(s))
+    except Exception: return None
+
+
+def normalize_row(r: dict) -> dict:
+    row = {}
+    for k, v in r.items():
+        if not k:
+            continue
+        v = v.strip() if isinstance(v, str) else None
+        row[k.strip()] = v or None
+    for k in INT_FIELDS:
+        if k in row:
+            row[k] = to_int(row[k])
+    return row
+
+
+def parse(raw: bytes) -> list:
+    text = raw.decode("utf-8-sig")
+    reader = csv.DictReader(io.StringIO(text, newline=""))
+    return [normalize_row(r) for r in reader]
+
+
+def _read_snapshot(key: str):
+    try:
+        with CACHE.open("rb") as f:
+            snap = pickle.load(f)
+    except Exception:
+        return None
+    if isinstance(snap, dict) and snap.get("key") == key:
+        return snap.get("rows")
+    return None
+
+
+def _write_snapshot(key: str, rows: list):
+    try:
+        CACHE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            pickle.dump({"key": key, "rows": rows}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(CACHE)
+    except OSError:
+        pass  # 快照只是加速，寫不進去不影響結果
+
+
+def load_manual(path: pathlib.Path = MANUAL) -> list:
+    """manual.csv → list[dict]；檔案不存在回傳 []"""
+    if not path.exists():
+        return []
+    raw = path.read_bytes()
+    key = f"{SCHEMA}:{hashlib.sha256(raw).hexdigest()}"
+
+    rows = _read_snapshot(key)
+    if rows is None:
+        rows = parse(raw)
+        _write_snapshot(key, rows)
+    return rows
+
+
+if __name__ == "__main__":
+    rows = load_manual()
+    print(f"[OK] manual.csv rows={len(rows)} ; with bgg_id={sum(1 for r in rows if r.get('bgg_id'))}")
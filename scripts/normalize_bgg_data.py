@@ -3,21 +3,19 @@
 """
 normalize_bgg_data.py — 2025 最終穩定版
 欄位相容處理 + 清洗資料 + 合併分類 / 機制
+
+  --stream   逐筆讀寫（jsonstream.py），記憶體用量不隨資料量成長
 """
 
-import json, pathlib
+import argparse, json, pathlib
+
+from jsonstream import iter_records, write_records
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 F = ROOT / "data" / "bgg_data.json"
 
-if not F.exists():
-    print("bgg_data.json 不存在")
-    exit(0)
 
-data = json.loads(F.read_text("utf-8"))
-out = []
-
-for g in data:
+def normalize(g: dict) -> dict:
     g2 = dict(g)
 
     # 欄位相容：舊名 → 新名
@@ -41,8 +39,27 @@ for g in data:
     g2["categories"] = sorted(list(cats))
     g2["mechanisms"] = sorted(list(mechs))
 
-    out.append(g2)
+    return g2
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stream", action="store_true", help="逐筆讀寫，不整份載入")
+    args = ap.parse_args()
+
+    if not F.exists():
+        print("bgg_data.json 不存在")
+        return
+
+    if args.stream:
+        write_records(F, (normalize(g) for g in iter_records(F)), indent=2)
+    else:
+        data = json.loads(F.read_text("utf-8"))
+        out = [normalize(g) for g in data]
+        F.write_text(json.dumps(out, ensure_ascii=False, indent=2), "utf-8")
+
+    print("[OK] normalize_bgg_data.py 完成")
 
-F.write_text(json.dumps(out, ensure_ascii=False, indent=2), "utf-8")
 
-print("[OK] normalize_bgg_data.py 完成")
+if __name__ == "__main__":
+    main()
@@ -6,22 +6,31 @@ publish_games.py
 目的：
 - 確保 site/data/games.json 一定是 `list[dict]` 結構，給前端直接使用。
 - 不再改動欄位，只做「來源選擇＋結構修正」。
+- --stream：來源是 JSON 陣列 / JSON Lines 時逐筆讀寫，不整份載入。
 """
 
+import argparse
 import json
 from pathlib import Path
 
+from jsonstream import is_array, iter_records, write_records
+
 ROOT = Path(__file__).resolve().parents[1]
 FULL = ROOT / "data" / "games_full.json"
 RAW  = ROOT / "data" / "bgg_data.json"
 OUT  = ROOT / "site" / "data" / "games.json"
 
 
-def load_source():
+def pick_source():
     """優先使用 games_full.json，沒有就退回 bgg_data.json。"""
     src = FULL if FULL.exists() else RAW
     if not src.exists():
         raise SystemExit("publish_games: no input JSON (games_full.json / bgg_data.json 都不存在)")
+    return src
+
+
+def load_source():
+    src = pick_source()
     text = src.read_text(encoding="utf-8")
     try:
         data = json.loads(text)
@@ -52,7 +61,20 @@ def normalize_rows(data):
     raise SystemExit("publish_games: input JSON is neither list nor dict")
 
 
-def main():
+def stream_main():
+    src = pick_source()
+    if not is_array(src):
+        # {"rows": [...]} 這類結構沒辦法逐筆讀，退回一般模式
+        print(f"publish_games: {src} 不是 JSON 陣列，改用一般模式")
+        return main_full()
+    try:
+        n = write_records(OUT, (r for r in iter_records(src) if isinstance(r, dict)), indent=2)
+    except ValueError as e:
+        raise SystemExit(f"publish_games: JSON parse error in {src}: {e}")
+    print(f"publish_games: mode=stream ; rows={n} → {OUT} (from {src})")
+
+
+def main_full():
     src, data = load_source()
     rows = normalize_rows(data)
 
@@ -62,5 +84,15 @@ def main():
     print(f"publish_games: mode=games_full ; rows={len(rows)} → {OUT} (from {src})")
 
 
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stream", action="store_true", help="逐筆讀寫，不整份載入")
+    args = ap.parse_args()
+    if args.stream:
+        stream_main()
+    else:
+        main_full()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+render_static.py — 把第一屏卡片預先渲染進 index.html
+
+讀 site/data/games.json：
+  - 預設排序（SORT 第一個選項）的前 FIRST_SCREEN 張卡片 → <div id="GRID">
+  - 分類 / 機制下拉選單（含數量）→ <select id="CAT"> / <select id="MECH">
+  - 第一屏紀錄本身 → <script id="PRERENDER">，資料還沒載完前也能開詳情
+前端照常在背景載入完整資料後 render() 接手。
+
+site/index.html 是 template（版本控制中的就是未渲染版本，永遠不改寫）；
+填好 <!--prerender:xxx--> … <!--/prerender:xxx--> 之間的內容後寫到 --out：
+  python3 scripts/render_static.py                       # → build/index.html（gitignore）
+  python3 scripts/render_static.py --out site/index.html # CI：部署前覆蓋 checkout 裡的副本
+可重複執行。
+"""
+
+import argparse, html, json, pathlib, re
+
+from facets import build_facets, cats_of, mechs_of
+from sort_ranks import SORT_KEYS, rank_order
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "site" / "data" / "games.json"
+TEMPLATE = ROOT / "site" / "index.html"
+OUT = ROOT / "build" / "index.html"
+
+FIRST_SCREEN = 24
+DEFAULT_SORT = "name_zh"
+
+
+def log(msg):
+    print(f"[render] {msg}")
+
+
+def esc(v) -> str:
+    return html.escape(js_str(v), quote=True)
+
+
+def js_str(v) -> str:
+    """與前端 `${v}` 相同的字串化（7.0 → "7"、None → ""）"""
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def fmt(v) -> str:
+    return "-" if v is None else esc(v)
+
+
+def chips(values: list, kind: str) -> str:
+    return "".join(
+        f'<span class="chip" onclick="chipFilter(\'{kind}\',\'{esc(v)}\',event)">{esc(v)}</span>'
+        for v in values
+    )
+
+
+def card_html(g: dict) -> str:
+    img = g.get("image") or g.get("thumbnail") or ""
+    used = g.get("used_price_twd")
+    stock = g.get("stock")
+    return f"""
+  <div class="card" onclick="openDetail('{esc(g.get('id'))}')">
+    <img class="cover" src="{esc(img)}" loading="lazy" decoding="async"
+      style="background-color:{esc(g.get('color') or '')}" data-bh="{esc(g.get('placeholder') or '')}"
+      onerror="this.onerror=null;this.removeAttribute('src')" />
+
+    <div class="title">{esc(g.get('name_zh') or g.get('name_en') or g.get('name'))}</div>
+    <div class="subtitle">{esc(g.get('name_en') or '')}</div>
+
+    <div style="font-size:14px;color:#444;">
+      <b>Bayes</b>：{fmt(g.get('rating_bayes'))}
+      ｜ <b>均分</b>：{fmt(g.get('rating_avg'))}
+      ｜ <b>重度</b>：{fmt(g.get('weight'))}
+    </div>
+
+    <div>{chips(cats_of(g), 'cat')}</div>
+    <div>{chips(mechs_of(g), 'mech')}</div>
+
+    <div style="margin-top:4px;font-size:14px;">
+      二手：{"NT$" + esc(used) if used else "-"}
+    </div>
+    <div style="font-size:14px;">
+      庫存：{esc(0 if stock is None else stock)}
+    </div>
+
+    <div style="margin-top:4px;font-size:13px;">
+      <a href="{esc(g.get('bgg_url'))}" target="_blank">前往 BGG</a>
+    </div>
+  </div>
+  """
+
+
+def options_html(facet: dict, all_label: str) -> str:
+    opts = [f'<option value="">{all_label}</option>']
+    for term, n in zip(facet["terms"], facet["counts"]):
+        opts.append(f'<option value="{esc(term)}">{esc(term)}（{n}）</option>')
+    return "".join(opts)
+
+
+def replace_block(text: str, name: str, content: str) -> str:
+    pat = re.compile(rf"(<!--prerender:{name}-->).*?(<!--/prerender:{name}-->)", re.S)
+    if not pat.search(text):
+        raise SystemExit(f"render_static: index.html 缺少 <!--prerender:{name}--> 標記")
+    return pat.sub(lambda m: m.group(1) + content + m.group(2), text, count=1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="pre-render the first screen into index.html")
+    ap.add_argument("--out", type=pathlib.Path, default=OUT, help=f"輸出檔（預設 {OUT.relative_to(ROOT)}）")
+    args = ap.parse_args()
+
+    if not SRC.exists():
+        log("找不到 site/data/games.json，跳過")
+        return
+
+    rows = [r for r in json.loads(SRC.read_text("utf-8")) if isinstance(r, dict)]
+    # 與前端相同的名次規則（sort_ranks.py）
+    first = [rows[i] for i in rank_order(rows, *SORT_KEYS[DEFAULT_SORT])[:FIRST_SCREEN]]
+
+    # </script> 不能出現在內嵌 JSON 裡
+    embedded = json.dumps(first, ensure_ascii=False).replace("</", "<\\/")
+
+    text = TEMPLATE.read_text("utf-8")
+    text = replace_block(text, "grid", "".join(card_html(g) for g in first))
+    facets = build_facets(rows)
+    text = replace_block(text, "cat", options_html(facets["categories"], "全部分類"))
+    text = replace_block(text, "mech", options_html(facets["mechanisms"], "全部機制"))
+    text = replace_block(text, "data",
+                         f'<script id="PRERENDER" type="application/json">{embedded}</script>')
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(text, "utf-8")
+
+    log(f"pre-rendered {len(first)} / {len(rows)} cards → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
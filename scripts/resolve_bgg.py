@@ -3,7 +3,7 @@
 """
 Resolve BoardGameGeek IDs from manual.csv
 
-- 讀取 data/manual.csv（UTF-8 with BOM 容忍）
+- 讀取 data/manual.csv（經 manual_csv.load_manual，UTF-8 with BOM 容忍）
 - 依序：bgg_url_override → bgg_id → bgg_query 搜尋
 - 產出 data/bgg_ids.json（原子寫入；未達門檻保留舊檔）
 - 環境變數：
@@ -15,11 +15,13 @@ Resolve BoardGameGeek IDs from manual.csv
 """
 
 import os
-import csv, json, re, time, random, xml.etree.ElementTree as ET
+import json, re, time, random, xml.etree.ElementTree as ET
 from pathlib import Path
 from urllib.parse import quote
 import requests
 
+from manual_csv import load_manual
+
 MANUAL = Path("data/manual.csv")
 OUT    = Path("data/bgg_ids.json")
 
@@ -39,13 +41,6 @@ if TOKEN:
 
 JLOW, JHIGH = 0.7, 1.3
 
-def _int_or_none(x):
-    if x is None: return None
-    s = str(x).strip()
-    if s == "" or s.lower() == "none": return None
-    try: return int(float(s))
-    except Exception: return None
-
 def _norm_name(s: str) -> str:
     s = s.lower()
     s = re.sub(r"[ \t\n\r\-\–\—:•·\.,!\"'®™()\[\]{}]", "", s)
@@ -92,6 +87,41 @@ def bgg_search_to_id(session: requests.Session, q: str):
         return best_id
     return None
 
+def resolve_entry(session: requests.Session, r: dict, search: bool = True):
+    """load_manual() 單列 → bgg_ids.json entry（search=False 時不打 BGG 搜尋）"""
+    entry = {
+        "name_zh": r.get("name_zh"),
+        "name_en_override": r.get("name_en_override"),
+        "alias_zh": r.get("alias_zh"),
+        "category_zh": r.get("category_zh"),
+        "price_msrp_twd": r.get("price_msrp_twd"),
+        "price_twd": r.get("price_twd"),
+        "used_price_twd": r.get("used_price_twd"),
+        "price_note": r.get("price_note"),
+        "used_note": r.get("used_note"),
+        "manual_override": r.get("manual_override"),
+        "stock": r.get("stock"),
+        "description": r.get("description"),
+        "image_override": r.get("image_override"),
+        "image_version_id": r.get("image_version_id"),
+        "link_override": r.get("link_override"),
+        "bgg_url_override": r.get("bgg_url_override"),
+    }
+
+    q      = r.get("bgg_query")
+    url_ov = r.get("bgg_url_override")
+
+    bid = _extract_id_from_url(url_ov) if url_ov else None
+    if not bid:
+        bid = r.get("bgg_id")
+    if not bid and q and search:
+        try: bid = bgg_search_to_id(session, q)
+        except Exception: bid = None
+
+    if bid: entry["bgg_id"] = int(bid)
+    if q:   entry["bgg_query"] = q
+    return entry
+
 def main():
     if not MANUAL.exists():
         OUT.write_text("[]", encoding="utf-8"); print("No manual.csv → 0"); return
@@ -99,44 +129,7 @@ def main():
     s = requests.Session()
     s.headers.update(HEADERS)
 
-    rows = []
-    with MANUAL.open(encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            entry = {
-                "name_zh": r.get("name_zh") or None,
-                "name_en_override": r.get("name_en_override") or None,
-                "alias_zh": r.get("alias_zh") or None,
-                "category_zh": r.get("category_zh") or None,
-                "price_msrp_twd": _int_or_none(r.get("price_msrp_twd")),
-                "price_twd": _int_or_none(r.get("price_twd")),
-                "used_price_twd": _int_or_none(r.get("used_price_twd")),
-                "price_note": r.get("price_note") or None,
-                "used_note": r.get("used_note") or None,
-                "manual_override": r.get("manual_override") or None,
-                "stock": _int_or_none(r.get("stock")),
-                "description": r.get("description") or None,
-                "image_override": (r.get("image_override") or "").strip() or None,
-                "image_version_id": (r.get("image_version_id") or "").strip() or None,
-                "link_override": r.get("link_override") or None,
-                "bgg_url_override": r.get("bgg_url_override") or None,
-            }
-
-            bid_raw = (r.get("bgg_id") or "").strip()
-            q       = (r.get("bgg_query") or "").strip()
-            url_ov  = (r.get("bgg_url_override") or "").strip()
-
-            bid = _extract_id_from_url(url_ov) if url_ov else None
-            if not bid and bid_raw:
-                try: bid = int(float(bid_raw))
-                except Exception: bid = None
-            if not bid and q:
-                try: bid = bgg_search_to_id(s, q)
-                except Exception: bid = None
-
-            if bid: entry["bgg_id"] = int(bid)
-            if q:   entry["bgg_query"] = q
-            rows.append(entry)
+    rows = [resolve_entry(s, r) for r in load_manual(MANUAL)]
 
     text = json.dumps(rows, ensure_ascii=False, indent=2)
     OUT.parent.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sort_ranks.py — 每個排序欄位預先算好的名次陣列
+
+ranks[key][i] = games 陣列第 i 筆在該欄位排序後的名次（0 起算，無並列）
+前端重新排序 = 依名次做整數排序，不必每次比較字串 / 處理 null。
+
+規則（所有欄位一致）：
+  - 由小到大；同值依原本順序
+  - 沒有值（null / 空字串 / 無法轉數字）一律排最後
+  - 文字欄位用 zh-Hant 排序（collation.py；沒有 ICU 時前端會自行重算文字欄位）
+"""
+
+from collation import COLLATION, zh_sort_key
+
+
+def _title(g: dict):
+    return g.get("name_zh") or g.get("name_en") or g.get("name")
+
+
+def _name_en(g: dict):
+    return g.get("name_en") or g.get("name")
+
+
+def _field(name):
+    return lambda g: g.get(name)
+
+
+# key → (type, 取值)
+SORT_KEYS = {
+    "name_zh": ("text", _title),
+    "name_en": ("text", _name_en),
+    "rating_bayes": ("num", _field("rating_bayes")),
+    "rating_avg": ("num", _field("rating_avg")),
+    "users_rated": ("num", _field("users_rated")),
+    "weight": ("num", _field("weight")),
+    "price_twd": ("num", _field("price_twd")),
+    "used_price_twd": ("num", _field("used_price_twd")),
+}
+
+
+def _num(v):
+    if v is None or isinstance(v, bool):
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(v):
+    if v is None:
+        return None
+    s = str(v).strip()
+    return s or None
+
+
+def rank_order(rows: list, kind: str, get) -> list:
+    """依規則排序後的 row 索引"""
+    conv = _num if kind == "num" else _text
+    vals = [conv(get(g)) for g in rows]
+    if kind == "text":
+        keys = [None if v is None else zh_sort_key(v) for v in vals]
+    else:
+        keys = vals
+    return sorted(range(len(rows)), key=lambda i: (keys[i] is None, keys[i] if keys[i] is not None else 0, i))
+
+
+def build_ranks(rows: list) -> dict:
+    ranks = {}
+    for key, (kind, get) in SORT_KEYS.items():
+        r = [0] * len(rows)
+        for pos, i in enumerate(rank_order(rows, kind, get)):
+            r[i] = pos
+        ranks[key] = r
+    return {
+        "collation": COLLATION,
+        "count": len(rows),
+        "text": [k for k, (kind, _) in SORT_KEYS.items() if kind == "text"],
+        "ranks": ranks,
+    }
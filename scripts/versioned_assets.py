@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+versioned_assets.py — 網站資料加上內容雜湊檔名 + manifest + delta patch
+
+輸出（site/data/）：
+  - games.<ver>.json          內容雜湊檔名（不可變，可長期快取）
+  - <name>.<ver>.json         跟著資料版本走的衍生索引（facets 等，位置對應 games 陣列）
+  - delta.<old>.<ver>.json    從舊版本升級用的差異檔
+  - manifest.json             目前版本、檔名、可用的 delta（前端每次都 no-cache 取這個）
+
+delta 格式：
+  {"from": old, "to": ver, "count": N,
+   "order": [i0, i1, -1, ...],   # 新陣列第 k 筆：>=0 → 沿用舊陣列第 i 筆；-1 → 依序取 rows
+   "rows": [...]}                # 新增 / 有變動的紀錄
+
+保留最近 KEEP 個版本（舊版本檔案與 delta 自動清掉）。
+
+stream 模式（build_json.py --stream）用 VersionWriter：逐筆寫 games.<ver>.json、邊寫邊算雜湊，
+版本號只雜湊資料本身（= 沒有 extras 的 publish(rows)；build_json 完整模式帶 facets / ranks，
+雜湊包含 extras，同一份資料兩種模式的版本號不同）；facet / 排序索引 / delta 需要整份資料，不產生
+（前端沒有這些檔就退回逐筆篩選 / 排序、整份下載）。
+delta 要靠磁碟上的舊 manifest / games.<ver>.json；CI 以 actions/cache 保存這些檔
+（.github/workflows/update.yml 的 Restore previous data versions）。
+"""
+
+import hashlib, json, pathlib
+from datetime import datetime, timezone
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "site" / "data"
+MANIFEST = DATA_DIR / "manifest.json"
+
+KEEP = 5
+
+
+def log(msg):
+    print(f"[assets] {msg}")
+
+
+def content_hash(b: bytes) -> str:
+    return hashlib.sha256(b).hexdigest()[:12]
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _row_keys(rows: list) -> list:
+    """每筆紀錄的穩定 key：bgg_id；沒有 bgg_id 的用內容雜湊。重複的加序號。"""
+    keys, seen = [], {}
+    for r in rows:
+        if r.get("bgg_id"):
+            k = f"id:{r['bgg_id']}"
+        else:
+            k = "h:" + content_hash(_dumps(r))
+        n = seen.get(k, 0)
+        seen[k] = n + 1
+        keys.append(k if n == 0 else f"{k}~{n}")
+    return keys
+
+
+def build_delta(old_rows: list, new_rows: list) -> dict:
+    old_idx = {k: i for i, k in enumerate(_row_keys(old_rows))}
+    order, changed = [], []
+    for k, r in zip(_row_keys(new_rows), new_rows):
+        i = old_idx.get(k)
+        if i is not None and old_rows[i] == r:
+            order.append(i)
+        else:
+            order.append(-1)
+            changed.append(r)
+    return {"order": order, "rows": changed}
+
+
+def load_manifest() -> dict:
+    if not MANIFEST.exists():
+        return {}
+    try:
+        return json.loads(MANIFEST.read_text("utf-8"))
+    except Exception:
+        return {}
+
+
+def _write_atomic(path: pathlib.Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def _finish(ver: str, data_name: str, count: int, nbytes: int,
+            files: dict, deltas: dict, history: list) -> dict:
+    """寫 manifest.json，並清掉不在保留名單內的版本檔 / delta；衍生索引只留目前版本"""
+    manifest = {
+        "version": ver,
+        "data": data_name,
+        "count": count,
+        "bytes": nbytes,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "files": files,
+        "deltas": deltas,
+        "history": history,
+    }
+    _write_atomic(MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    keep = {data_name, *deltas.values(), *files.values()} | {f"games.{v}.json" for v in history}
+    for p in DATA_DIR.glob("*.*.json"):
+        if p.name not in keep:
+            p.unlink(missing_ok=True)
+    return manifest
+
+
+def publish(rows: list, extras: dict | None = None) -> dict:
+    """寫出 games.<ver>.json（+ extras）+ delta + manifest.json；回傳新的 manifest"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+    body = _dumps(rows)
+    extra_bodies = {name: _dumps(obj) for name, obj in sorted((extras or {}).items())}
+    ver = content_hash(body + b"".join(extra_bodies.values()))
+    old = load_manifest()
+    if old.get("version") == ver and (DATA_DIR / old.get("data", "")).exists():
+        log(f"version {ver} 未變動")
+        return old
+
+    data_name = f"games.{ver}.json"
+    _write_atomic(DATA_DIR / data_name, body)
+
+    files = {}
+    for name, b in extra_bodies.items():
+        files[name] = f"{name}.{ver}.json"
+        _write_atomic(DATA_DIR / files[name], b)
+
+    # 舊版本（含上一版）→ 各產一份 delta
+    history = [v for v in old.get("history", []) if v != ver]
+    deltas = {}
+    for prev in history[:KEEP - 1]:
+        prev_file = DATA_DIR / f"games.{prev}.json"
+        if not prev_file.exists():
+            continue
+        d = build_delta(json.loads(prev_file.read_text("utf-8")), rows)
+        d = {"from": prev, "to": ver, "count": len(rows), **d}
+        name = f"delta.{prev}.{ver}.json"
+        _write_atomic(DATA_DIR / name, _dumps(d))
+        deltas[prev] = name
+
+    history = [ver] + [v for v in history if v in deltas]
+    manifest = _finish(ver, data_name, len(rows), len(body), files, deltas, history)
+
+    log(f"version {ver} ; rows={len(rows)} ; deltas={len(deltas)}")
+    return manifest
+
+
+class VersionWriter:
+    """逐筆寫 games.<ver>.json + manifest（stream 模式）；檔案位元組與 publish(rows) 的相同，版本號只在沒有 extras 時相同"""
+
+    def __init__(self):
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        self.tmp = DATA_DIR / "games.stream.tmp"
+        self.f = self.tmp.open("wb")
+        self.h = hashlib.sha256()
+        self.count = 0
+        self.bytes = 0
+        self._write(b"[")
+
+    def _write(self, b: bytes):
+        self.f.write(b)
+        self.h.update(b)
+        self.bytes += len(b)
+
+    def write(self, rec):
+        self._write((b"," if self.count else b"") + _dumps(rec))
+        self.count += 1
+
+    def close(self) -> dict:
+        self._write(b"]")
+        self.f.close()
+        ver = self.h.hexdigest()[:12]
+        data_name = f"games.{ver}.json"
+        self.tmp.replace(DATA_DIR / data_name)
+
+        # 舊版本檔留著（下次完整 build 還能對它們產 delta），但這一版沒有 delta
+        old = load_manifest()
+        history = [ver] + [v for v in old.get("history", []) if v != ver
+                           and (DATA_DIR / f"games.{v}.json").exists()][:KEEP - 1]
+        manifest = _finish(ver, data_name, self.count, self.bytes, {}, {}, history)
+        log(f"version {ver} ; rows={self.count} ; stream（無 facet / 排序索引 / delta）")
+        return manifest
+
+    def abort(self):
+        self.f.close()
+        self.tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+if __name__ == "__main__":
+    from facets import build_facets
+    from sort_ranks import build_ranks
+
+    src = DATA_DIR / "games.json"
+    rows = json.loads(src.read_text("utf-8")) if src.exists() else []
+    publish(rows, extras={"facets": build_facets(rows), "ranks": build_ranks(rows)})
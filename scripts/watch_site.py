@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+watch_site.py — 本機編輯用 watch mode
+
+監看：
+  - data/manual.csv
+  - data/category_map_zh.csv / data/mechanism_map_zh.csv
+變動時以「列」為單位 diff：
+  - 只對受影響的 bgg_id 重新 resolve / fetch（已抓過的 ID 直接用 catalog_db 的 bgg 表）
+  - 覆蓋值寫回 catalog_db 的 manual 表，受影響的 ID 用 catalog_db.rebuild 重建
+    （與完整 build 同一個 merge_game；收錄規則見 catalog_db.live_ids），
+    再從 games 表輸出 games_full.json 與 site/data/games.json
+    （只寫這兩個檔：不跑 versioned_assets.publish、不重新 import；版本化檔案等下次完整 build）
+  - resolve 結果（含這次搜尋到的 ID）寫回 data/bgg_ids.json，下次完整 build 不會丟掉
+  - 跟完整 build 一致：bgg_ids.txt 裡的 ID 一定保留（manual 列刪光只是沒有覆蓋值），
+    不在 bgg_ids.txt 也沒有 manual 列的才移除
+同時用 http.server 提供 site/（預設 http://127.0.0.1:8000/）；
+data/manifest.json 一律回 404，頁面退回直接讀 data/games.json（watch 寫的就是這個檔）
+
+用法：
+  python3 scripts/watch_site.py [--port 8000] [--interval 0.25] [--no-serve]
+"""
+
+import argparse, json, pathlib, threading, time
+from collections import Counter
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import catalog_db
+from apply_taxonomy_and_price import CATEGORY_MAP, MECHANISM_MAP, load_overrides, load_taxonomy
+from build_json import write_json
+from fetch_bgg import API_HEADERS, fetch_one
+from manual_csv import MANUAL, load_manual
+from resolve_bgg import resolve_entry
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+IDS_JSON = ROOT / "data" / "bgg_ids.json"
+SITE = ROOT / "site"
+
+WATCHED = [MANUAL, CATEGORY_MAP, MECHANISM_MAP]
+
+
+def log(msg):
+    print(f"[watch] {msg}", flush=True)
+
+
+def _load_json(path: pathlib.Path, default):
+    if not path.exists():
+        return default
+    return json.loads(path.read_text("utf-8"))
+
+
+def _stat(path: pathlib.Path):
+    try:
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+
+
+def _entries_text(entries: list) -> str:
+    return json.dumps(entries, ensure_ascii=False, indent=2)
+
+
+def _row_key(r: dict) -> str:
+    return json.dumps(r, ensure_ascii=False, sort_keys=True)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        # manifest 指向上次完整 build 的 games.<ver>.json；預覽要讀 watch 改過的 games.json
+        if self.path.split("?", 1)[0] == "/data/manifest.json":
+            self.send_error(404)
+            return
+        super().do_GET()
+
+    def end_headers(self):
+        # 本機預覽：永遠不要讓瀏覽器拿舊檔
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int):
+    handler = partial(_QuietHandler, directory=str(SITE))
+    httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    log(f"serving {SITE} → http://127.0.0.1:{port}/")
+    return httpd
+
+
+class Watcher:
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update(API_HEADERS)
+
+        # 上次 resolve 的結果：bgg_query → bgg_id（避免重新搜尋沒變的列）
+        saved = _load_json(IDS_JSON, [])
+        self.saved_ids = _entries_text(saved)
+        self.query_ids = {
+            e["bgg_query"]: e["bgg_id"]
+            for e in saved
+            if e.get("bgg_query") and e.get("bgg_id")
+        }
+
+        # bgg / manual / games 以現有 JSON 檔補齊（內容沒變就不寫）
+        self.db = catalog_db.connect()
+        with self.db:
+            catalog_db.import_files(self.db)
+        self.cat_map, self.mech_map = load_taxonomy()
+
+        self.rows = load_manual()
+        self.entries = {}  # row_key → resolve_entry 結果
+        for r in self.rows:
+            self._resolve(r, search=False)
+
+        self.stamps = {p: _stat(p) for p in WATCHED}
+
+    # --------------------------------------------------
+    # resolve（單列）
+    # --------------------------------------------------
+    def _resolve(self, r: dict, search: bool = True) -> dict:
+        key = _row_key(r)
+        if key in self.entries:
+            return self.entries[key]
+        e = resolve_entry(self.session, r, search=False)
+        q = e.get("bgg_query")
+        if not e.get("bgg_id") and q:
+            if q in self.query_ids:
+                e["bgg_id"] = self.query_ids[q]
+            elif search:
+                e = resolve_entry(self.session, r, search=True)
+                if e.get("bgg_id"):
+                    self.query_ids[q] = e["bgg_id"]
+        self.entries[key] = e
+        return e
+
+    def save_entries(self, entries: list):
+        """resolve 結果寫回 bgg_ids.json（格式同 resolve_bgg.py，原子寫入；沒變就不寫）"""
+        text = _entries_text(entries)
+        if text == self.saved_ids:
+            return
+        tmp = IDS_JSON.with_suffix(".watch.tmp")
+        tmp.write_text(text, "utf-8")
+        tmp.replace(IDS_JSON)
+        self.saved_ids = text
+        log(f"bgg_ids.json 已更新（{len(entries)} 列）")
+
+    @staticmethod
+    def _bid(e: dict):
+        return int(e["bgg_id"]) if e.get("bgg_id") else None
+
+    # --------------------------------------------------
+    # diff
+    # --------------------------------------------------
+    def diff_manual(self) -> set:
+        new_rows = load_manual()
+        old_c = Counter(_row_key(r) for r in self.rows)
+        new_c = Counter(_row_key(r) for r in new_rows)
+
+        affected = set()
+        for key in (old_c - new_c):
+            bid = self._bid(self.entries.get(key, {}))
+            if bid:
+                affected.add(bid)
+
+        added = new_c - old_c
+        for r in new_rows:
+            if _row_key(r) in added:
+                bid = self._bid(self._resolve(r))
+                if bid:
+                    affected.add(bid)
+
+        self.rows = new_rows
+        live = {_row_key(r) for r in new_rows}
+        self.entries = {k: v for k, v in self.entries.items() if k in live}
+        log(f"manual.csv: -{sum((old_c - new_c).values())} +{sum(added.values())} 列")
+        return affected
+
+    def diff_taxonomy(self) -> set:
+        cat_map, mech_map = load_taxonomy()
+        changed_cats = {k for k in self.cat_map.keys() | cat_map.keys()
+                        if self.cat_map.get(k) != cat_map.get(k)}
+        changed_mechs = {k for k in self.mech_map.keys() | mech_map.keys()
+                         if self.mech_map.get(k) != mech_map.get(k)}
+        self.cat_map, self.mech_map = cat_map, mech_map
+
+        live = set(catalog_db.live_ids(self.db)) | {self._bid(e) for e in self.entries.values()}
+        affected = set()
+        for g in catalog_db.iter_bgg(self.db):
+            if g["bgg_id"] not in live:
+                continue
+            if changed_cats & set(g.get("categories", [])) or \
+               changed_mechs & set(g.get("mechanisms", [])):
+                affected.add(g["bgg_id"])
+        log(f"taxonomy: {len(changed_cats)} 分類 / {len(changed_mechs)} 機制 變動")
+        return affected
+
+    # --------------------------------------------------
+    # patch
+    # --------------------------------------------------
+    def rebuild(self, affected: set):
+        # 覆蓋值 = 目前 manual.csv 的 resolve 結果（記憶體中）+ override.json
+        entries = [self.entries[_row_key(r)] for r in self.rows]
+        self.save_entries(entries)
+        with self.db:
+            catalog_db.sync_manual(self.db, load_overrides(entries))
+        live = set(catalog_db.live_ids(self.db))
+
+        # 新 ID：抓一次 BGG，原始紀錄存進 bgg 表（一筆一個 transaction）
+        for bid in sorted(affected & live):
+            if catalog_db.bgg_record(self.db, bid) is not None:
+                continue
+            log(f"fetch {bid}")
+            raw = fetch_one(bid)
+            with self.db:
+                catalog_db.record_fetch(self.db, bid, ok=bool(raw), error=None if raw else "fetch failed")
+                if raw:
+                    catalog_db.put_bgg(self.db, raw)
+
+        with self.db:
+            changed = catalog_db.rebuild(self.db, affected)
+        rows = list(catalog_db.iter_games(self.db))
+
+        write_json(rows)
+        log(f"patched {len(affected)} 筆（{changed} 列變動）→ rows={len(rows)}")
+
+    # --------------------------------------------------
+    # loop
+    # --------------------------------------------------
+    def poll(self):
+        changed = [p for p in WATCHED if _stat(p) != self.stamps[p]]
+        if not changed:
+            return
+        time.sleep(0.05)  # 等編輯器寫完
+        self.stamps = {p: _stat(p) for p in WATCHED}
+
+        t0 = time.perf_counter()
+        affected = set()
+        if MANUAL in changed:
+            affected |= self.diff_manual()
+        if CATEGORY_MAP in changed or MECHANISM_MAP in changed:
+            affected |= self.diff_taxonomy()
+        if affected:
+            self.rebuild(affected)
+        log(f"done in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="watch manual.csv / taxonomy maps and patch site data")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--interval", type=float, default=0.25, help="輪詢間隔（秒）")
+    ap.add_argument("--no-serve", action="store_true", help="只監看，不啟動 http server")
+    args = ap.parse_args()
+
+    w = Watcher()
+    log(f"watching {len(WATCHED)} files；manual rows={len(w.rows)}")
+    if not args.no_serve:
+        serve(args.port)
+
+    try:
+        while True:
+            w.poll()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        log("bye")
+
+
+if __name__ == "__main__":
+    main()
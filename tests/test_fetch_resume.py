@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+fetch_bgg.py 續抓：checkpoint 最後一行寫到一半（中斷）時，重跑要先截掉殘行，
+後面新抓的紀錄不能接在殘行上；不分片模式缺 ID 時不寫出、保留 checkpoint。
+"""
+
+import json, pathlib
+
+import pytest
+
+pytest.importorskip("requests")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def fetch_bgg(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(ROOT / "scripts"))
+    import catalog_db
+    import fetch_bgg
+
+    data = tmp_path / "data"
+    data.mkdir()
+    monkeypatch.setattr(fetch_bgg, "IDS_FILE", data / "bgg_ids.txt")
+    monkeypatch.setattr(fetch_bgg, "OUT_FILE", data / "bgg_data.json")
+    monkeypatch.setattr(fetch_bgg, "SHARD_DIR", data / "bgg_shards")
+    real_connect = catalog_db.connect
+    monkeypatch.setattr(catalog_db, "connect", lambda: real_connect(data / "catalog.sqlite3"))
+    monkeypatch.setattr(fetch_bgg.time, "sleep", lambda s: None)
+    monkeypatch.setattr(fetch_bgg, "fetch_one", lambda gid: {"bgg_id": gid, "name": f"Game {gid}"})
+    return fetch_bgg
+
+
+def run_main(fetch_bgg, monkeypatch, *args):
+    monkeypatch.setattr("sys.argv", ["fetch_bgg.py", *args])
+    fetch_bgg.main()
+
+
+def test_resume_after_partial_write(fetch_bgg, monkeypatch):
+    fetch_bgg.IDS_FILE.write_text("1\n2\n3\n", "utf-8")
+    path = fetch_bgg.shard_file(1, 1)
+    path.parent.mkdir(parents=True)
+    path.write_text('{"bgg_id": 1, "name": "Game 1"}\n{"bgg_id": 2, "na', "utf-8")
+
+    run_main(fetch_bgg, monkeypatch)
+
+    rows = json.loads(fetch_bgg.OUT_FILE.read_text("utf-8"))
+    assert [r["bgg_id"] for r in rows] == [1, 2, 3]
+    assert not path.exists()
+
+
+def test_truncate_partial_keeps_complete_lines(fetch_bgg):
+    path = fetch_bgg.shard_file(1, 2)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b'{"bgg_id": 2}\n{"bgg_id": 4}\n{"bgg_')
+    fetch_bgg.truncate_partial(path)
+    assert path.read_bytes() == b'{"bgg_id": 2}\n{"bgg_id": 4}\n'
+
+    path.write_bytes(b'{"bgg_id": 2')
+    fetch_bgg.truncate_partial(path)
+    assert path.read_bytes() == b""
+
+
+def test_unsharded_missing_ids_fail(fetch_bgg, monkeypatch):
+    fetch_bgg.IDS_FILE.write_text("1\n2\n3\n", "utf-8")
+    monkeypatch.setattr(fetch_bgg, "fetch_one",
+                        lambda gid: None if gid == 2 else {"bgg_id": gid, "name": f"Game {gid}"})
+
+    with pytest.raises(SystemExit):
+        run_main(fetch_bgg, monkeypatch)
+    assert not fetch_bgg.OUT_FILE.exists()
+    assert set(fetch_bgg.read_checkpoint(fetch_bgg.shard_file(1, 1))) == {1, 3}
+
+    run_main(fetch_bgg, monkeypatch, "--allow-partial")
+    rows = json.loads(fetch_bgg.OUT_FILE.read_text("utf-8"))
+    assert [r["bgg_id"] for r in rows] == [1, 3]
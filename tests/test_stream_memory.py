@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+--stream 模式的記憶體上限：100k 筆合成資料依序跑過每個 --stream stage，
+每個 stage 的峰值 RSS 都不能超過 PEAK_MB（不隨資料量成長）。
+
+fixture 依序在各自的 subprocess 跑完所有 stage（scripts/ 複製到 tmp_path，ROOT 就是 tmp_path），
+記下每個 stage 的峰值（該 process 的 ru_maxrss）；測試只檢查結果，不依賴執行順序。
+"""
+
+import json, pathlib, shutil, subprocess, sys
+
+import pytest
+
+resource = pytest.importorskip("resource")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+ROWS = 100_000
+PEAK_MB = 80
+
+STAGES = [
+    "normalize_bgg_data.py",
+    "apply_taxonomy_and_price.py",
+    "build_json.py",
+    "publish_games.py",
+]
+
+RUNNER = """
+import pathlib, resource, runpy, sys
+script = sys.argv[1]
+sys.argv = [script, "--stream"]
+sys.path.insert(0, str(pathlib.Path(script).parent))
+runpy.run_path(script, run_name="__main__")
+print("PEAK_KB", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+CATS = ["Card Game", "Economic", "Fantasy", "Party Game", "Wargame", "Abstract Strategy"]
+MECHS = ["Hand Management", "Dice Rolling", "Set Collection", "Worker Placement", "Deck Building"]
+
+
+def synthetic(i: int) -> dict:
+    return {
+        "bgg_id": i + 1,
+        "name": f"Synthetic Game {i:06d}",
+        "image": f"https://cf.geekdo-images.com/pic{i}.jpg",
+        "thumbnail": f"https://cf.geekdo-images.com/pic{i}_t.jpg",
+        "minplayers": 1 + i % 4,
+        "maxplayers": 2 + i % 6,
+        "minplaytime": 15 + i % 60,
+        "maxplaytime": 30 + i % 120,
+        "rating_avg": round(5 + (i % 500) / 100, 2),
+        "rating_bayes": round(5 + (i % 300) / 100, 2),
+        "users_rated": float(i % 10000),
+        "weight": round(1 + (i % 400) / 100, 2),
+        "categories": [CATS[i % len(CATS)], CATS[(i * 7) % len(CATS)]],
+        "mechanisms": [MECHS[i % len(MECHS)]],
+    }
+
+
+@pytest.fixture(scope="module")
+def stream_run(tmp_path_factory):
+    root = tmp_path_factory.mktemp("stream")
+    shutil.copytree(ROOT / "scripts", root / "scripts",
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    (root / "data").mkdir()
+    for name in ("category_map_zh.csv", "mechanism_map_zh.csv"):
+        shutil.copy(ROOT / "data" / name, root / "data" / name)
+
+    with (root / "data" / "bgg_data.json").open("w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(ROWS):
+            f.write(("," if i else "") + json.dumps(synthetic(i), ensure_ascii=False))
+        f.write("]")
+
+    peaks = {}
+    for stage in STAGES:
+        proc = subprocess.run(
+            [sys.executable, "-c", RUNNER, str(root / "scripts" / stage)],
+            cwd=root, capture_output=True, text=True, timeout=900,
+        )
+        assert proc.returncode == 0, f"{stage}: {proc.stderr}"
+        peaks[stage] = int(proc.stdout.rsplit("PEAK_KB", 1)[1]) / 1024
+    return root, peaks
+
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_stream_stage_peak_memory(stream_run, stage):
+    _, peaks = stream_run
+    assert peaks[stage] < PEAK_MB, f"{stage}: peak RSS {peaks[stage]:.0f} MB"
+
+
+def test_stream_outputs_complete(stream_run, monkeypatch):
+    root, _ = stream_run
+    monkeypatch.syspath_prepend(str(ROOT / "scripts"))
+    from jsonstream import iter_records
+
+    site = root / "site" / "data"
+    manifest = json.loads((site / "manifest.json").read_text("utf-8"))
+    assert manifest["count"] == ROWS
+    assert (site / manifest["data"]).exists()
+    assert sum(1 for _ in iter_records(site / "games.json")) == ROWS